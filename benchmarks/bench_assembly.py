@@ -0,0 +1,131 @@
+"""Time and peak memory of print-document assembly at 10..10,000 cards.
+
+Compares the old ``pages_html +=`` / ``print_doc = ... + pages_html + ...``
+build with the chunk generators in ``compare_and_save.pages``, consumed both
+by ``"".join`` and by writing straight to a file. The card cache is disabled
+so every mode renders every card.
+
+    python benchmarks/bench_assembly.py [--json results.json] 10 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_and_save import (
+    CARD_CSS,
+    ProductRow,
+    card_cache,
+    iter_deck_cards,
+    iter_pages_html,
+    iter_print_document,
+    render_card_html,
+)
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+COMPETITOR = "Winco"
+CHECK_DATE = date(2026, 10, 18)
+
+
+def sample_rows(count: int) -> Iterator[ProductRow]:
+    for i in range(count):
+        yield ProductRow(name=f"Product {i + 1}", super_one_price=1.99 + i % 50, competitor_price=2.49 + i % 50, carries="Yes")
+
+
+def build_concat(count: int) -> int:
+    rows = list(sample_rows(count))
+    pages = [rows[i : i + 4] for i in range(0, len(rows), 4)]
+    pages_html = '<div class="cs-pages">'
+    for pi, page_rows in enumerate(pages):
+        pages_html += f'<div class="cs-page{" is-last" if pi == len(pages) - 1 else ""}">'
+        for row in page_rows:
+            pages_html += render_card_html(competitor=COMPETITOR, check_date=CHECK_DATE, row=row, arc="inline")
+        pages_html += "</div>"
+    pages_html += "</div>"
+    print_doc = (
+        "<!doctype html><html><head><meta charset='utf-8'>"
+        "<meta name='viewport' content='width=device-width, initial-scale=1'>"
+        "<title>Compare and Save - Print</title>"
+        + CARD_CSS
+        + "</head><body style='margin:0; overflow:auto;'>"
+        + f"<div id='print-area'>{pages_html}</div>"
+        + "</body></html>"
+    )
+    return len(print_doc)
+
+
+def iter_document(count: int) -> Iterator[str]:
+    cards = iter_deck_cards(sample_rows(count), competitor=COMPETITOR, check_date=CHECK_DATE)
+    return iter_print_document(iter_pages_html(cards))
+
+
+def build_join(count: int) -> int:
+    return len("".join(iter_document(count)))
+
+
+def build_file(count: int) -> int:
+    with tempfile.TemporaryFile("w", encoding="utf-8") as fp:
+        fp.writelines(iter_document(count))
+        return fp.tell()
+
+
+MODES: dict[str, Callable[[int], int]] = {"concat": build_concat, "join": build_join, "file": build_file}
+
+
+def measure(build: Callable[[int], int], count: int) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    build(count)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def run(sizes: list[int]) -> list[dict]:
+    # Cards are rendered every time; the cache gets its size back for the
+    # suites run_all runs next in this process
+    maxsize = card_cache.info().maxsize
+    card_cache.resize(0)
+    results = []
+    try:
+        for count in sizes:
+            for mode, build in MODES.items():
+                ms, peak = measure(build, count)
+                results.append(
+                    {"suite": "assembly", "name": f"{mode}/{count}", "cards": count, "ms": ms, "ms_per_card": ms / count, "peak_mib": peak}
+                )
+    finally:
+        card_cache.resize(maxsize)
+    return results
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'cards':>6} {'mode':>7} {'ms':>9} {'ms/card':>8} {'peak MiB':>9}")
+    for result in results:
+        mode = result["name"].split("/")[0]
+        print(f"{result['cards']:>6} {mode:>7} {result['ms']:>9.1f} {result['ms_per_card']:>8.3f} {result['peak_mib']:>9.2f}")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SIZES), help="card counts")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run(args.sizes)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,101 @@
+"""Memory and savings-formatting speed: list of ProductRow vs ProductBatch.
+
+For each row count, reports the memory held by a deck as a list of
+``ProductRow`` dataclasses and as a ``ProductBatch`` (traced allocations,
+names included), and the time to format every card's savings amount the
+float way (``money(abs(a - b))``) and the integer-cents way
+(``money_cents(savings_cents(row))``) over the batch.
+
+    python benchmarks/bench_batch.py [--json results.json] 10000 50000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_and_save import ProductBatch, ProductRow, money, money_cents, savings_cents
+
+DEFAULT_SIZES = (10000, 50000)
+
+
+def sample_rows(count: int) -> list[ProductRow]:
+    return [
+        ProductRow(
+            name=f"Product {i + 1}",
+            super_one_price=round(1.99 + i % 50 + (i % 7) * 0.01, 2),
+            competitor_price=round(2.49 + i % 50 + (i % 11) * 0.01, 2),
+            carries="DNC" if i % 10 == 0 else "Yes",
+        )
+        for i in range(count)
+    ]
+
+
+def traced_kib(build: Callable[[], object]) -> float:
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current / 1024
+
+
+def timed_ms(work: Callable[[], object], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(sizes: list[int]) -> list[dict]:
+    results = []
+    for count in sizes:
+        rows = sample_rows(count)
+        batch = ProductBatch.from_rows(rows)
+        results.append(
+            {
+                "suite": "batch",
+                "name": f"rows/{count}",
+                "rows": count,
+                "list_kib": traced_kib(lambda: sample_rows(count)),
+                "batch_kib": traced_kib(lambda: ProductBatch.from_rows(sample_rows(count))),
+                "float_fmt_ms": timed_ms(lambda: [money(abs(r.competitor_price - r.super_one_price)) for r in rows]),
+                "cents_fmt_ms": timed_ms(
+                    lambda: [money_cents(abs(c - s)) for s, c in zip(batch.super_one_cents, batch.competitor_cents)]
+                ),
+                "row_fmt_ms": timed_ms(lambda: [money_cents(savings_cents(r)) for r in batch]),
+            }
+        )
+    return results
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'rows':>6} {'list KiB':>9} {'batch KiB':>10} {'float ms':>9} {'cents ms':>9} {'view ms':>8}")
+    for r in results:
+        print(
+            f"{r['rows']:>6} {r['list_kib']:>9.0f} {r['batch_kib']:>10.0f} "
+            f"{r['float_fmt_ms']:>9.1f} {r['cents_fmt_ms']:>9.1f} {r['row_fmt_ms']:>8.1f}"
+        )
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SIZES), help="row counts")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run(args.sizes)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
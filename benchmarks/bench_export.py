@@ -0,0 +1,100 @@
+"""Peak memory of writing one store's decks to disk, by deck size.
+
+Compares loading the price list and building every deck as a list
+(``read_price_checks`` + ``deck_rows_by_competitor``) with the streamed
+``render_store`` path (``DeckSpool`` + page-at-a-time writers) that the
+command line uses. Both write the same HTML files; peak is traced Python
+allocation while writing them.
+
+    python benchmarks/bench_export.py [--json results.json] 1000 10000 50000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+from datetime import date
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_and_save import COMPETITORS, card_cache, deck_rows_by_competitor, read_price_checks
+from compare_and_save.cli import render_store, write_deck
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+CHECK_DATE = date(2026, 10, 18)
+
+
+def write_price_list(path: Path, count: int) -> None:
+    with open(path, "w", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["Product Name", "Super 1 Price"] + [f"{c} {h}" for c in COMPETITORS for h in ("Price", "Carries?")])
+        for i in range(count):
+            prices = [f"{2.49 + i % 50:.2f}", "DNC" if i % 10 == 0 else "Yes"] * len(COMPETITORS)
+            writer.writerow([f"Product {i + 1}", f"{1.99 + i % 50:.2f}", *prices])
+
+
+def export_lists(price_list: Path, out_dir: Path) -> None:
+    decks = deck_rows_by_competitor(read_price_checks(price_list), COMPETITORS)
+    for competitor, rows in decks.items():
+        write_deck(out_dir / f"list-{competitor[:5]}.html", "html", rows, competitor=competitor, check_date=CHECK_DATE)
+
+
+def export_stream(price_list: Path, out_dir: Path) -> None:
+    render_store(price_list, out_dir, competitors=COMPETITORS, check_date=CHECK_DATE, formats=["html"])
+
+
+MODES: dict[str, Callable[[Path, Path], None]] = {"list": export_lists, "stream": export_stream}
+
+
+def run(sizes: list[int]) -> list[dict]:
+    # A warm card cache would hide the rendering; keep it out of the picture
+    # and give it its size back for the suites run_all runs next
+    maxsize = card_cache.info().maxsize
+    card_cache.resize(0)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for count in sizes:
+                price_list = Path(tmp) / f"store-{count}.csv"
+                write_price_list(price_list, count)
+                for mode, export in MODES.items():
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    export(price_list, Path(tmp))
+                    elapsed = time.perf_counter() - start
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    results.append(
+                        {"suite": "export", "name": f"{mode}/{count}", "rows": count, "ms": elapsed * 1000, "peak_mib": peak / 1024 / 1024}
+                    )
+    finally:
+        card_cache.resize(maxsize)
+    return results
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'rows':>6} {'mode':>7} {'ms':>9} {'peak MiB':>9}")
+    for result in results:
+        mode = result["name"].split("/")[0]
+        print(f"{result['rows']:>6} {mode:>7} {result['ms']:>9.1f} {result['peak_mib']:>9.2f}")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SIZES), help="products per store")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run(args.sizes)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,159 @@
+"""Fuzzy name matching: index build and join time, and how often it is right.
+
+Builds a synthetic Super 1 catalog ("Tillamook Sharp Cheddar 2lb") and a
+competitor catalog of the same products spelled the way another store
+would ("TILLAMOOK SHRP CHED 32OZ": upper case, abbreviated or dropped
+words, other size units, shuffled order), then times ``NameIndex`` over
+the competitor names and ``NameIndex.match`` of every Super 1 name, and
+reports the share of Super 1 names whose best match is the wrong product
+(top-1) and the share left wrong or unpaired by one-to-one ``pair_names``.
+For scale, ``pairwise s`` extrapolates the time of comparing each Super 1
+name with every competitor name (Jaccard over the same features) from
+the first 100 names.
+
+    python benchmarks/bench_matching.py [--json results.json] 10000 50000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_and_save.matching import NameIndex, name_features, pair_names
+
+DEFAULT_SIZES = (10000, 50000)
+SEED = 18
+PAIRWISE_SAMPLE = 100
+
+PRODUCTS = (
+    "cheddar", "mozzarella", "butter", "yogurt", "milk", "cream cheese", "sour cream", "cottage cheese",
+    "eggs", "bacon", "sausage", "ham", "turkey", "chicken breast", "ground beef", "hot dogs", "bread",
+    "bagels", "tortillas", "english muffins", "cereal", "oatmeal", "granola", "pancake mix", "syrup",
+    "peanut butter", "jelly", "honey", "coffee", "tea", "orange juice", "apple juice", "lemonade", "soda",
+    "sparkling water", "chips", "crackers", "pretzels", "popcorn", "cookies", "ice cream", "frozen pizza",
+    "frozen vegetables", "pasta", "spaghetti sauce", "macaroni cheese", "rice", "beans", "soup", "salsa",
+    "ketchup", "mustard", "mayonnaise", "ranch dressing", "olive oil", "vegetable oil", "flour", "sugar",
+    "brown sugar", "baking soda", "salt", "pepper", "paper towels", "toilet paper", "dish soap",
+    "laundry detergent", "trash bags", "shampoo", "toothpaste", "dog food", "cat food", "diapers",
+)
+DESCRIPTORS = (
+    "sharp", "medium", "mild", "original", "organic", "natural", "classic", "whole", "reduced fat",
+    "low sodium", "extra virgin", "honey roasted", "family size", "unsweetened", "vanilla", "chocolate",
+    "strawberry", "spicy", "smoked", "thick cut", "hickory", "sea salt", "light", "zero sugar", "creamy",
+    "crunchy", "multigrain", "whole wheat", "gluten free", "fresh", "golden", "deluxe",
+)
+SIZES = (
+    ("8", "oz"), ("12", "oz"), ("16", "oz"), ("24", "oz"), ("32", "oz"), ("1", "lb"), ("2", "lb"),
+    ("3", "lb"), ("5", "lb"), ("1", "gal"), ("64", "fl oz"), ("12", "ct"), ("6", "pk"), ("2", "l"),
+)
+# Same size, other unit
+OTHER_UNITS = {
+    ("16", "oz"): ("1", "lb"), ("1", "lb"): ("16", "oz"), ("32", "oz"): ("2", "lb"), ("2", "lb"): ("32", "oz"),
+    ("3", "lb"): ("48", "oz"), ("5", "lb"): ("80", "oz"), ("1", "gal"): ("128", "fl oz"),
+    ("64", "fl oz"): ("0.5", "gal"), ("6", "pk"): ("6", "ct"), ("2", "l"): ("67.6", "fl oz"),
+}
+SYLLABLES = ("ba", "ko", "ri", "ta", "mel", "son", "ver", "al", "do", "na", "zi", "lo", "mar", "ket", "sun", "wy")
+
+
+def brands(rng: random.Random, count: int) -> list[str]:
+    names: set[str] = set()
+    while len(names) < count:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title())
+    return sorted(names)
+
+
+def abbreviate(rng: random.Random, word: str) -> str:
+    roll = rng.random()
+    if len(word) <= 4 or roll < 0.6:
+        return word
+    if roll < 0.8:
+        return word[: rng.randint(3, 5)]
+    return word[0] + "".join(c for c in word[1:] if c not in "aeiou")
+
+
+def catalogs(count: int) -> tuple[list[str], list[str], list[int]]:
+    # Super 1 names, competitor names, and the competitor index of each
+    # Super 1 product
+    rng = random.Random(SEED)
+    brand_names = brands(rng, max(50, count // 25))
+    products: set[tuple[str, str, str, tuple[str, str]]] = set()
+    while len(products) < count:
+        products.add((rng.choice(brand_names), rng.choice(DESCRIPTORS), rng.choice(PRODUCTS), rng.choice(SIZES)))
+    super_one = []
+    competitor = []
+    for brand, descriptor, product, size in sorted(products):
+        super_one.append(f"{brand} {descriptor.title()} {product.title()} {size[0]}{size[1]}")
+        words = [brand, *(descriptor.split() if rng.random() < 0.8 else []), *product.split()]
+        words = [words[0], *(abbreviate(rng, word) for word in words[1:])]
+        amount, unit = OTHER_UNITS.get(size, size) if rng.random() < 0.5 else size
+        competitor.append(f"{' '.join(words)} {amount}{'' if rng.random() < 0.5 else ' '}{unit}".upper())
+    order = list(range(count))
+    rng.shuffle(order)
+    truth = [0] * count
+    for position, item in enumerate(order):
+        truth[item] = position
+    return super_one, [competitor[item] for item in order], truth
+
+
+def pairwise_seconds(super_one: list[str], competitor: list[str]) -> float:
+    features = [set(name_features(name)) for name in competitor]
+    sample = super_one[:PAIRWISE_SAMPLE]
+    start = time.perf_counter()
+    for name in sample:
+        query = set(name_features(name))
+        max(range(len(features)), key=lambda item: len(query & features[item]) / len(query | features[item]))
+    return (time.perf_counter() - start) * len(super_one) / len(sample)
+
+
+def run(sizes: list[int]) -> list[dict]:
+    results = []
+    for count in sizes:
+        super_one, competitor, truth = catalogs(count)
+        start = time.perf_counter()
+        index = NameIndex(competitor)
+        indexed = time.perf_counter()
+        matches = index.match(super_one, min_score=0.0)
+        matched = time.perf_counter()
+        pairs = pair_names(index.match(super_one, top=3, min_score=0.0))
+        results.append(
+            {
+                "suite": "matching",
+                "name": f"join/{count}",
+                "rows": count,
+                "index_ms": (indexed - start) * 1000,
+                "match_ms": (matched - indexed) * 1000,
+                "top1_wrong": 1 - sum(truth[m.super_one] == m.competitor for m in matches) / count,
+                "pairs_wrong": 1 - sum(truth[m.super_one] == m.competitor for m in pairs) / count,
+                "pairwise_s": pairwise_seconds(super_one, competitor),
+            }
+        )
+    return results
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'rows':>6} {'index ms':>9} {'match ms':>9} {'top-1 bad':>9} {'1:1 bad':>7} {'pairwise s':>11}")
+    for r in results:
+        print(
+            f"{r['rows']:>6} {r['index_ms']:>9.0f} {r['match_ms']:>9.0f} "
+            f"{r['top1_wrong']:>9.1%} {r['pairs_wrong']:>7.1%} {r['pairwise_s']:>11.0f}"
+        )
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SIZES), help="products per catalog")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run(args.sizes)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+"""Time single-card rendering for normal and DNC rows.
+
+Reports microseconds per ``render_card_html`` call for a card with savings
+and a "does not carry" card, in every arc mode, plus ``cached_card_html``
+on a warm card cache. "outlined" is skipped where it would fall back to
+"shared" (no fontTools or no arc font).
+
+    python benchmarks/bench_render.py [--json results.json]
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date
+import json
+from pathlib import Path
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_and_save import ARC_MODES, ProductRow, cached_card_html, card_cache, render_card_html, resolve_arc_mode
+
+COMPETITOR = "Winco"
+CHECK_DATE = date(2026, 10, 18)
+ROWS = {
+    "normal": ProductRow(name="Tillamook Medium Cheddar 2lb", super_one_price=7.99, competitor_price=9.49, carries="Yes"),
+    "dnc": ProductRow(name="Tillamook Medium Cheddar 2lb", super_one_price=7.99, competitor_price=0.0, carries="DNC"),
+}
+NUMBER = 2000
+REPEAT = 5
+
+
+def per_call_us(stmt, number: int = NUMBER, repeat: int = REPEAT) -> float:
+    return statistics.median(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e6
+
+
+def run() -> list[dict]:
+    arcs = [arc for arc in ARC_MODES if resolve_arc_mode(arc) == arc]
+    if len(arcs) < len(ARC_MODES):
+        print(f"skipping arc modes that fall back: {', '.join(sorted(set(ARC_MODES) - set(arcs)))}", file=sys.stderr)
+    results = []
+    for kind, row in ROWS.items():
+        for arc in arcs:
+            us = per_call_us(lambda: render_card_html(competitor=COMPETITOR, check_date=CHECK_DATE, row=row, arc=arc))
+            size = len(render_card_html(competitor=COMPETITOR, check_date=CHECK_DATE, row=row, arc=arc))
+            results.append({"suite": "render", "name": f"{kind}/{arc}", "us_per_card": us, "bytes": size})
+
+        card_cache.clear()
+        cached_card_html(competitor=COMPETITOR, check_date=CHECK_DATE, row=row)
+        us = per_call_us(lambda: cached_card_html(competitor=COMPETITOR, check_date=CHECK_DATE, row=row))
+        results.append({"suite": "render", "name": f"{kind}/cached", "us_per_card": us})
+    return results
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'case':>16} {'us/card':>9} {'bytes':>7}")
+    for result in results:
+        print(f"{result['name']:>16} {result['us_per_card']:>9.1f} {result.get('bytes', ''):>7}")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run()
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,106 @@
+"""Time full-script reruns of the Streamlit app with N products entered.
+
+Drives ``streamlit_app.py`` through Streamlit's headless ``AppTest`` harness
+and reports, per product count, the median rerun time and the serialized
+size of the elements the rerun produced (a stand-in for the websocket delta).
+
+    python benchmarks/bench_reruns.py [--json results.json] 100 500 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_and_save import COMPETITORS
+from compare_and_save.catalog import CATALOG_PATH_ENV
+
+APP_PATH = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+DEFAULT_SIZES = (100, 500, 2000)
+RERUNS = 5
+
+
+def seeded_frame(num_rows: int) -> pd.DataFrame:
+    columns = {
+        "Product Name": [f"Product {i + 1}" for i in range(num_rows)],
+        "Super 1 Price": [1.99 + (i % 50) for i in range(num_rows)],
+    }
+    for competitor in COMPETITORS:
+        columns[f"{competitor} Price"] = [2.49 + (i % 50) for i in range(num_rows)]
+        columns[f"{competitor} Carries?"] = ["DNC" if i % 10 == 0 else "Yes" for i in range(num_rows)]
+    return pd.DataFrame(columns)
+
+
+def delta_bytes(node) -> int:
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if proto is not None and hasattr(proto, "ByteSize") else 0
+    for child in getattr(node, "children", {}).values():
+        size += delta_bytes(child)
+    return size
+
+
+def bench(num_rows: int) -> dict:
+    at = AppTest.from_file(str(APP_PATH), default_timeout=600)
+    at.session_state["products_frame"] = seeded_frame(num_rows)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    timings = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "suite": "reruns",
+        "name": f"rows/{num_rows}",
+        "rows": num_rows,
+        "rerun_ms": statistics.median(timings) * 1000,
+        "delta_kb": delta_bytes(at._tree) / 1024,
+    }
+
+
+def run(sizes: list[int]) -> list[dict]:
+    # Keep the app's catalog away from the working directory
+    saved_catalog = os.environ.get(CATALOG_PATH_ENV)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ[CATALOG_PATH_ENV] = str(Path(tmp) / "catalog.sqlite3")
+        try:
+            return [bench(num_rows) for num_rows in sizes]
+        finally:
+            if saved_catalog is None:
+                del os.environ[CATALOG_PATH_ENV]
+            else:
+                os.environ[CATALOG_PATH_ENV] = saved_catalog
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'rows':>6} {'rerun ms':>10} {'delta KiB':>10}")
+    for result in results:
+        print(f"{result['rows']:>6} {result['rerun_ms']:>10.1f} {result['delta_kb']:>10.1f}")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SIZES), help="product counts")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run(args.sizes)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,247 @@
+"""Load test: N store managers using the app at once, in one process.
+
+Each simulated session is a headless ``AppTest`` of ``streamlit_app.py`` on
+its own thread, seeded with the same weekly product list except for a few
+store-specific prices, and all sessions start together. Every session does
+a cold first run and then cycles through plain reruns and paging the
+preview forward. As in a real server, the sessions share one runtime and
+one compiled script; that takes patching AppTest internals, so the harness
+only runs on the Streamlit releases in STREAMLIT_VERSIONS (run_all skips it
+on others). Reports rerun latency percentiles over all sessions,
+wall time per rerun (the inverse of throughput), server RSS (current, and
+the peak sampled during the run) and the shared caches' hit rates and sizes.
+
+    python benchmarks/bench_sessions.py [--json results.json] [--products 2000] [--reruns 6] 1 4 16
+"""
+from __future__ import annotations
+
+import argparse
+from contextlib import contextmanager, nullcontext
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Iterator
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import streamlit
+
+# one_server() patches AppTest internals, which change between releases.
+# These are the releases it was written and checked against.
+STREAMLIT_VERSIONS = ("1.66",)
+if ".".join(streamlit.__version__.split(".")[:2]) not in STREAMLIT_VERSIONS:
+    raise RuntimeError(
+        f"bench_sessions patches Streamlit's AppTest internals and needs Streamlit "
+        f"{' or '.join(f'{version}.x' for version in STREAMLIT_VERSIONS)}; this is {streamlit.__version__}"
+    )
+
+from streamlit import config
+from streamlit.components.v2.component_manager import BidiComponentManager
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test, local_script_runner
+
+from bench_reruns import seeded_frame
+from compare_and_save.cache import MIB, shared_caches
+from compare_and_save.catalog import CATALOG_PATH_ENV
+
+APP_PATH = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+DEFAULT_SESSIONS = (1, 4, 16)
+DEFAULT_PRODUCTS = 2000
+DEFAULT_RERUNS = 6
+STORE_PRICES = 20  # products each store prices differently
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def rss_kib() -> int:
+    # Resident set size of this process (Linux), 0 where /proc is missing
+    try:
+        with open("/proc/self/statm") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class RssSampler(threading.Thread):
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self.peak_kib = rss_kib()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(RSS_SAMPLE_SECONDS):
+            self.peak_kib = max(self.peak_kib, rss_kib())
+
+    def stop(self) -> int:
+        self._done.set()
+        self.join()
+        return self.peak_kib
+
+
+@contextmanager
+def one_server() -> Iterator[None]:
+    # AppTest sets up (and tears down) a process-global runtime, script cache
+    # and config per run, so concurrent AppTests trample each other. Give all
+    # sessions one runtime and one compiled script instead, like a server.
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    script_cache = ScriptCache()
+    # Compiled once up front: CPython 3.11's ast.parse is not thread-safe
+    script_cache.get_bytecode(str(APP_PATH))
+    saved_runtime, saved_app_test = Runtime._instance, config.get_option("global.appTest")
+    Runtime._instance = runtime
+    config.set_option("global.appTest", True)
+    try:
+        with (
+            # Each run's own mock runtime lands on a subclass nobody reads
+            patch.object(app_test, "Runtime", type("SessionRuntime", (Runtime,), {})),
+            patch.object(app_test, "ScriptCache", lambda: script_cache),
+            patch.object(local_script_runner, "ScriptCache", lambda: script_cache),
+            patch.object(app_test, "patch_config_options", lambda options: nullcontext()),
+        ):
+            yield
+    finally:
+        Runtime._instance = saved_runtime
+        config.set_option("global.appTest", saved_app_test)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def session(
+    store: int, products: int, reruns: int, start: threading.Barrier, latencies: list[float], errors: list[str]
+) -> None:
+    frame = seeded_frame(products)
+    frame.loc[: STORE_PRICES - 1, "Super 1 Price"] = [0.99 + store * 0.01] * STORE_PRICES
+    at = AppTest.from_file(str(APP_PATH), default_timeout=600)
+    at.session_state["products_frame"] = frame
+    start.wait()
+    for step in range(reruns + 1):
+        began = time.perf_counter()
+        if step % 2 == 0:
+            at.run()
+        else:
+            next_page = [button for button in at.button if button.key and button.key.startswith("next_")]
+            (next_page[0].click() if next_page else at).run()
+        latencies.append((time.perf_counter() - began) * 1000)
+        if at.exception:
+            errors.append(str(at.exception[0].message))
+            return
+
+
+def cache_stats() -> dict[str, dict[str, float]]:
+    stats = {}
+    for name, cache in shared_caches().items():
+        info = cache.info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+            "entries": info.currsize,
+            "mib": info.nbytes / MIB,
+        }
+    return stats
+
+
+def run_sessions(sessions: int, *, products: int, reruns: int) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    start = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(target=session, args=(store, products, reruns, start, latencies, errors))
+        for store in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    sampler = RssSampler()
+    sampler.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    peak = sampler.stop()
+    if errors:
+        raise RuntimeError(errors[0])
+    return {
+        "suite": "sessions",
+        "name": f"sessions/{sessions}",
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies),
+        "wall_ms_per_rerun": elapsed * 1000 / len(latencies),
+        "rss_mib": rss_kib() / 1024,
+        "peak_rss_mib": peak / 1024,
+        "caches": cache_stats(),
+    }
+
+
+def run(sizes: list[int], *, products: int = DEFAULT_PRODUCTS, reruns: int = DEFAULT_RERUNS) -> list[dict]:
+    # The sessions' catalog is scratch; the caller's setting comes back after
+    saved_catalog = os.environ.get(CATALOG_PATH_ENV)
+    with tempfile.TemporaryDirectory() as tmp, one_server():
+        os.environ[CATALOG_PATH_ENV] = str(Path(tmp) / "catalog.sqlite3")
+        try:
+            return [run_sessions(sessions, products=products, reruns=reruns) for sessions in sizes]
+        finally:
+            if saved_catalog is None:
+                del os.environ[CATALOG_PATH_ENV]
+            else:
+                os.environ[CATALOG_PATH_ENV] = saved_catalog
+
+
+def print_table(results: list[dict]) -> None:
+    print(
+        f"{'sessions':>8} {'reruns':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+        f"{'wall ms':>8} {'RSS MiB':>8} {'peak MiB':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['sessions']:>8} {r['reruns']:>6} {r['p50_ms']:>8.1f} {r['p90_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+            f"{r['max_ms']:>8.1f} {r['wall_ms_per_rerun']:>8.1f} {r['rss_mib']:>8.1f} {r['peak_rss_mib']:>9.1f}"
+        )
+    if results:
+        caches = results[-1]["caches"]
+        print(
+            "shared caches after the last run: "
+            + ", ".join(
+                f"{name} {c['hit_rate']:.0%} hits, {c['entries']:,} entries, {c['mib']:.1f} MiB"
+                for name, c in caches.items()
+            )
+        )
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=list(DEFAULT_SESSIONS), help="concurrent sessions")
+    parser.add_argument("--products", type=int, default=DEFAULT_PRODUCTS, help="products per session")
+    parser.add_argument("--reruns", type=int, default=DEFAULT_RERUNS, help="reruns per session after the first")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    results = run(args.sizes, products=args.products, reruns=args.reruns)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
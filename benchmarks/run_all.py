@@ -0,0 +1,150 @@
+"""Run the benchmark suite and store the results as JSON.
+
+    python benchmarks/run_all.py                      # all suites -> benchmarks/results/<time>-<commit>.json
+    python benchmarks/run_all.py --quick --skip reruns --skip sessions
+    python benchmarks/run_all.py compare OLD.json NEW.json
+
+Each result file holds the commit, interpreter and machine it was measured
+on plus one record per case. ``compare`` lines up cases by suite and name and
+prints the change in every metric, so a regression between two commits shows
+up as a number.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+
+import bench_assembly
+import bench_batch
+import bench_export
+import bench_matching
+import bench_render
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+SUITES = ("render", "batch", "assembly", "export", "matching", "reruns", "sessions")
+ASSEMBLY_SIZES = [10, 100, 1000, 10000]
+RERUN_SIZES = [100, 500, 2000]
+BATCH_SIZES = [10000, 50000]
+EXPORT_SIZES = [1000, 10000, 50000]
+MATCHING_SIZES = [10000, 50000]
+QUICK_ASSEMBLY_SIZES = [10, 100, 1000]
+QUICK_BATCH_SIZES = [10000]
+QUICK_EXPORT_SIZES = [1000]
+QUICK_MATCHING_SIZES = [2000]
+QUICK_RERUN_SIZES = [100]
+SESSION_SIZES = [1, 4, 16]
+QUICK_SESSION_SIZES = [1, 4]
+REGRESSION_THRESHOLD = 0.10  # flag metrics that got 10% worse
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], cwd=BENCH_DIR, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{out}-dirty" if dirty.strip() else out
+
+
+def run_suites(suites: list[str], *, quick: bool) -> list[dict]:
+    results: list[dict] = []
+    if "render" in suites:
+        results += bench_render.run()
+    if "batch" in suites:
+        results += bench_batch.run(QUICK_BATCH_SIZES if quick else BATCH_SIZES)
+    if "assembly" in suites:
+        results += bench_assembly.run(QUICK_ASSEMBLY_SIZES if quick else ASSEMBLY_SIZES)
+    if "export" in suites:
+        results += bench_export.run(QUICK_EXPORT_SIZES if quick else EXPORT_SIZES)
+    if "matching" in suites:
+        results += bench_matching.run(QUICK_MATCHING_SIZES if quick else MATCHING_SIZES)
+    if "reruns" in suites:
+        import bench_reruns  # needs streamlit and pandas
+
+        results += bench_reruns.run(QUICK_RERUN_SIZES if quick else RERUN_SIZES)
+    if "sessions" in suites:
+        try:
+            import bench_sessions  # needs streamlit and pandas, at a version it knows
+        except RuntimeError as exc:
+            print(f"skipping sessions: {exc}", file=sys.stderr)
+        else:
+            results += bench_sessions.run(QUICK_SESSION_SIZES if quick else SESSION_SIZES)
+    return results
+
+
+def compare(old_path: Path, new_path: Path) -> int:
+    # Lower is better for every metric the suites record
+    old, new = json.loads(old_path.read_text()), json.loads(new_path.read_text())
+    old_by_case = {(r["suite"], r["name"]): r for r in old["results"]}
+    print(f"{old['commit']} -> {new['commit']}")
+    print(f"{'suite':>9} {'case':>18} {'metric':>12} {'old':>10} {'new':>10} {'change':>8}")
+    regressions = 0
+    for record in new["results"]:
+        before = old_by_case.get((record["suite"], record["name"]))
+        if before is None:
+            continue
+        for metric, value in record.items():
+            if metric in ("suite", "name") or not isinstance(value, (int, float)) or metric not in before:
+                continue
+            if metric in ("cards", "rows", "sessions", "reruns"):
+                continue
+            base = before[metric]
+            change = (value - base) / base if base else 0.0
+            flag = " !" if change > REGRESSION_THRESHOLD else ""
+            regressions += bool(flag)
+            print(
+                f"{record['suite']:>9} {record['name']:>18} {metric:>12} {base:>10.3f} {value:>10.3f} {change:>+8.1%}{flag}"
+            )
+    return 1 if regressions else 0
+
+
+def main(argv: list[str]) -> int:
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="run_all.py compare")
+        parser.add_argument("old", type=Path)
+        parser.add_argument("new", type=Path)
+        args = parser.parse_args(argv[1:])
+        return compare(args.old, args.new)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skip", action="append", choices=SUITES, default=[], help="suite to leave out (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast check")
+    parser.add_argument("-o", "--out", type=Path, help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    commit = git_commit()
+    results = run_suites([suite for suite in SUITES if suite not in args.skip], quick=args.quick)
+    report = {
+        "commit": commit,
+        "started": started.isoformat(timespec="seconds"),
+        "quick": args.quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+    out = args.out or RESULTS_DIR / f"{started:%Y%m%d-%H%M%S}-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    for suite in SUITES:
+        suite_results = [r for r in results if r["suite"] == suite]
+        if suite_results:
+            print(f"\n[{suite}]")
+            sys.modules[f"bench_{suite}"].print_table(suite_results)
+    print(f"\nwrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,243 @@
+# Compare and Save - card model and renderers, importable without Streamlit.
+#
+# Only the model is imported up front. Everything else loads on first
+# attribute access (PEP 562), so `import compare_and_save` stays cheap and
+# the PDF writer, importers, catalog and font pipeline only load for callers
+# that use them.
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+from .model import (
+    COMPETITORS,
+    PriceCheck,
+    ProductRow,
+    competitor_slug,
+    format_check_date,
+    money,
+    money_cents,
+    to_cents,
+)
+
+# Public name -> submodule that defines it
+_LAZY_EXPORTS = {
+    "ARC_MODES": "arcs",
+    "arc_defs_html": "arcs",
+    "resolve_arc_mode": "arcs",
+    "BatchRow": "batch",
+    "ProductBatch": "batch",
+    "cached_card_html": "cards",
+    "card_cache": "cards",
+    "card_id": "cards",
+    "competitor_label_html": "cards",
+    "render_card_html": "cards",
+    "Catalog": "catalog",
+    "CatalogChanges": "catalog",
+    "normalize_name": "catalog",
+    "FeedPrice": "feeds",
+    "FeedSnapshot": "feeds",
+    "FeedWatcher": "feeds",
+    "iter_feed_prices": "feeds",
+    "read_feed_prices": "feeds",
+    "PriceListError": "importers",
+    "iter_price_checks": "importers",
+    "iter_price_list": "importers",
+    "iter_price_list_chunks": "importers",
+    "read_price_checks": "importers",
+    "read_price_list": "importers",
+    "NameIndex": "matching",
+    "NameMatch": "matching",
+    "match_names": "matching",
+    "name_features": "matching",
+    "pair_names": "matching",
+    "CARDS_PER_PAGE": "pages",
+    "DeckSpool": "pages",
+    "deck_rows": "pages",
+    "deck_rows_by_competitor": "pages",
+    "document_cache": "pages",
+    "iter_deck_cards": "pages",
+    "iter_pages_html": "pages",
+    "iter_print_document": "pages",
+    "print_document": "pages",
+    "render_decks_html": "pages",
+    "render_page_window": "pages",
+    "render_pages_html": "pages",
+    "render_deck_pdf": "pdf",
+    "write_deck_pdf": "pdf",
+    "is_dnc": "pricing",
+    "is_overpriced": "pricing",
+    "price_errors": "pricing",
+    "savings": "pricing",
+    "savings_cents": "pricing",
+    "CARD_CSS": "styles",
+    "DeckSummary": "table",
+    "PRODUCT_COLUMNS": "table",
+    "PrintDeck": "table",
+    "apply_competitor_prices": "table",
+    "carries_column": "table",
+    "checks_from_frame": "table",
+    "clean_price_table": "table",
+    "deck_digest": "table",
+    "deck_summary": "table",
+    "deck_table": "table",
+    "empty_price_table": "table",
+    "frame_from_checks": "table",
+    "iter_table_cards": "table",
+    "price_column": "table",
+    "preview_cache": "table",
+    "price_error_table": "table",
+    "print_deck": "table",
+    "print_deck_cache": "table",
+    "table_digest": "table",
+    "table_rows": "table",
+}
+
+
+def __getattr__(name: str) -> object:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from .arcs import ARC_MODES, arc_defs_html, resolve_arc_mode
+    from .batch import BatchRow, ProductBatch
+    from .cards import cached_card_html, card_cache, card_id, competitor_label_html, render_card_html
+    from .catalog import Catalog, CatalogChanges, normalize_name
+    from .feeds import FeedPrice, FeedSnapshot, FeedWatcher, iter_feed_prices, read_feed_prices
+    from .importers import (
+        PriceListError,
+        iter_price_checks,
+        iter_price_list,
+        iter_price_list_chunks,
+        read_price_checks,
+        read_price_list,
+    )
+    from .matching import NameIndex, NameMatch, match_names, name_features, pair_names
+    from .pages import (
+        CARDS_PER_PAGE,
+        DeckSpool,
+        deck_rows,
+        deck_rows_by_competitor,
+        document_cache,
+        iter_deck_cards,
+        iter_pages_html,
+        iter_print_document,
+        print_document,
+        render_decks_html,
+        render_page_window,
+        render_pages_html,
+    )
+    from .pdf import render_deck_pdf, write_deck_pdf
+    from .pricing import is_dnc, is_overpriced, price_errors, savings, savings_cents
+    from .styles import CARD_CSS
+    from .table import (
+        PRODUCT_COLUMNS,
+        DeckSummary,
+        PrintDeck,
+        apply_competitor_prices,
+        carries_column,
+        checks_from_frame,
+        clean_price_table,
+        deck_digest,
+        deck_summary,
+        deck_table,
+        empty_price_table,
+        frame_from_checks,
+        iter_table_cards,
+        price_column,
+        preview_cache,
+        price_error_table,
+        print_deck,
+        print_deck_cache,
+        table_digest,
+        table_rows,
+    )
+
+__all__ = [
+    "ARC_MODES",
+    "BatchRow",
+    "CARDS_PER_PAGE",
+    "CARD_CSS",
+    "COMPETITORS",
+    "Catalog",
+    "CatalogChanges",
+    "DeckSpool",
+    "DeckSummary",
+    "FeedPrice",
+    "FeedSnapshot",
+    "FeedWatcher",
+    "NameIndex",
+    "NameMatch",
+    "PRODUCT_COLUMNS",
+    "PriceCheck",
+    "PriceListError",
+    "PrintDeck",
+    "ProductBatch",
+    "ProductRow",
+    "apply_competitor_prices",
+    "arc_defs_html",
+    "cached_card_html",
+    "card_cache",
+    "card_id",
+    "carries_column",
+    "checks_from_frame",
+    "clean_price_table",
+    "competitor_label_html",
+    "competitor_slug",
+    "deck_digest",
+    "deck_rows",
+    "deck_rows_by_competitor",
+    "deck_summary",
+    "deck_table",
+    "document_cache",
+    "empty_price_table",
+    "format_check_date",
+    "frame_from_checks",
+    "is_dnc",
+    "is_overpriced",
+    "iter_deck_cards",
+    "iter_feed_prices",
+    "iter_pages_html",
+    "iter_price_checks",
+    "iter_price_list",
+    "iter_price_list_chunks",
+    "iter_print_document",
+    "iter_table_cards",
+    "match_names",
+    "money",
+    "money_cents",
+    "name_features",
+    "normalize_name",
+    "pair_names",
+    "preview_cache",
+    "price_column",
+    "price_error_table",
+    "price_errors",
+    "print_deck",
+    "print_deck_cache",
+    "print_document",
+    "read_feed_prices",
+    "read_price_checks",
+    "read_price_list",
+    "render_card_html",
+    "render_deck_pdf",
+    "render_decks_html",
+    "render_page_window",
+    "render_pages_html",
+    "resolve_arc_mode",
+    "savings",
+    "savings_cents",
+    "table_digest",
+    "table_rows",
+    "to_cents",
+    "write_deck_pdf",
+]
@@ -0,0 +1,203 @@
+# "BUYING POWER / SAVINGS" arc artwork for the savings side of a card.
+#
+# Modes:
+#   shared   - one <symbol> per document, every card <use>s it (default)
+#   outlined - same, but the symbol holds the arc text pre-baked as glyph
+#              outlines, so browsers skip text-on-path layout entirely
+#   inline   - each card carries its own <defs> and <textPath>s (the old output)
+#
+# Outlining needs fontTools and a bold sans font file (Arial Bold or a
+# stand-in), looked up in the card font directories and then the system's
+# font folders. Without them "outlined" falls back to "shared";
+# resolve_arc_mode says which mode will actually be drawn.
+from __future__ import annotations
+
+from functools import lru_cache
+import importlib.util
+import math
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+from .fonts import font_dirs
+
+ARC_MODES = ("shared", "outlined", "inline")
+ARC_MODE_ENV = "COMPARE_AND_SAVE_ARC_MODE"
+DEFAULT_ARC_MODE = os.environ.get(ARC_MODE_ENV, "shared")
+
+ARC_FONT_FILES = ("arialbd.ttf", "Arial Bold.ttf", "Arial-BoldMT.ttf", "LiberationSans-Bold.ttf", "DejaVuSans-Bold.ttf")
+SYSTEM_FONT_DIRS = (
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "~/.local/share/fonts",
+    "~/.fonts",
+    "/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+    "~/Library/Fonts",
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+)
+OUTLINED_ARC_UNAVAILABLE = (
+    f"the outlined arc needs fontTools and one of {', '.join(ARC_FONT_FILES)} "
+    "in the card font directories or the system fonts"
+)
+ARC_VIEWBOX = "0 0 250 170"
+
+
+class ArcLine(NamedTuple):
+    text: str
+    css_class: str
+    x0: float  # the arc runs over the top from (x0, y) to (x1, y)
+    x1: float
+    y: float
+    r: float
+    size: float  # px, from .cs-arc-text / .cs-arc-text2
+    letter_spacing: float
+
+
+ARC_LINES = (
+    ArcLine("BUYING POWER", "cs-arc-text", 15, 235, 130, 110, 18, 4),
+    ArcLine("SAVINGS", "cs-arc-text cs-arc-text2", 35, 215, 145, 95, 22, 5),
+)
+
+
+def check_arc_mode(arc: str) -> str:
+    if arc not in ARC_MODES:
+        raise ValueError(f"unknown arc mode {arc!r} (expected one of {', '.join(ARC_MODES)})")
+    return arc
+
+
+def arc_path(line: ArcLine) -> str:
+    return f"M {line.x0:g},{line.y:g} A {line.r:g},{line.r:g} 0 0,1 {line.x1:g},{line.y:g}"
+
+
+def text_on_path_lines(path_ids: tuple[str, ...]) -> list[str]:
+    lines = []
+    for line, path_id in zip(ARC_LINES, path_ids):
+        lines += [
+            f'<text class="{line.css_class}">',
+            f'<textPath href="#{path_id}" startOffset="50%" text-anchor="middle">{line.text}</textPath>',
+            "</text>",
+        ]
+    return lines
+
+
+def inline_arc_svg(uid: str) -> list[str]:
+    top_id, bottom_id = f"arcTop_{uid}", f"arcBottom_{uid}"
+    return [
+        f'<svg class="cs-arc" viewBox="{ARC_VIEWBOX}" preserveAspectRatio="xMidYMid meet" aria-hidden="true">',
+        "<defs>",
+        f'<path id="{top_id}" d="{arc_path(ARC_LINES[0])}" fill="none" stroke="none"></path>',
+        f'<path id="{bottom_id}" d="{arc_path(ARC_LINES[1])}" fill="none" stroke="none"></path>',
+        "</defs>",
+        *text_on_path_lines((top_id, bottom_id)),
+        "</svg>",
+    ]
+
+
+# The same markup for every card, whatever its content
+SHARED_ARC_SVG = [
+    f'<svg class="cs-arc" viewBox="{ARC_VIEWBOX}" preserveAspectRatio="xMidYMid meet" aria-hidden="true">',
+    '<use href="#cs-arc" width="250" height="170"></use>',
+    "</svg>",
+]
+
+
+def card_arc_svg(arc: str, uid: str) -> list[str]:
+    return inline_arc_svg(uid) if check_arc_mode(arc) == "inline" else SHARED_ARC_SVG
+
+
+@lru_cache(maxsize=None)
+def find_arc_font() -> Path | None:
+    for directory in font_dirs():
+        for file_name in ARC_FONT_FILES:
+            path = directory / file_name
+            if path.is_file():
+                return path
+    # System font folders nest by vendor ("truetype/dejavu/"), so walk them
+    # once and take the most Arial-like file found
+    found: dict[str, Path] = {}
+    for directory in SYSTEM_FONT_DIRS:
+        for root, _, files in os.walk(os.path.expanduser(directory)):
+            for file_name in set(files).intersection(ARC_FONT_FILES):
+                found.setdefault(file_name, Path(root, file_name))
+    return next((found[file_name] for file_name in ARC_FONT_FILES if file_name in found), None)
+
+
+def resolve_arc_mode(arc: str) -> str:
+    # The mode arc_defs_html will draw for `arc`
+    if check_arc_mode(arc) == "outlined" and (importlib.util.find_spec("fontTools") is None or find_arc_font() is None):
+        return "shared"
+    return arc
+
+
+def _number(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def outlined_arc_lines(font_path: Path) -> list[str]:
+    # Glyph outlines placed the way <textPath startOffset="50%"
+    # text-anchor="middle"> places them: each glyph's baseline midpoint on the
+    # arc, rotated to the tangent.
+    from fontTools.pens.svgPathPen import SVGPathPen
+    from fontTools.pens.transformPen import TransformPen
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(font_path)
+    glyph_set = font.getGlyphSet()
+    cmap = font.getBestCmap()
+    units_per_em = font["head"].unitsPerEm
+
+    lines = []
+    for line in ARC_LINES:
+        half_chord = (line.x1 - line.x0) / 2
+        cx = line.x0 + half_chord
+        cy = line.y + math.sqrt(max(line.r**2 - half_chord**2, 0.0))  # circle center, below the chord
+        arc_length = 2 * line.r * math.asin(min(half_chord / line.r, 1.0))
+
+        scale = line.size / units_per_em
+        glyph_names = [cmap.get(ord(ch), ".notdef") for ch in line.text]
+        advances = [glyph_set[name].width * scale + line.letter_spacing for name in glyph_names]
+        offset = arc_length / 2 - sum(advances) / 2
+        pen = SVGPathPen(glyph_set, ntos=_number)
+        for name, advance in zip(glyph_names, advances):
+            glyph_w = advance - line.letter_spacing
+            alpha = (offset + glyph_w / 2 - arc_length / 2) / line.r  # angle from the top of the arc
+            px, py = cx + line.r * math.sin(alpha), cy - line.r * math.cos(alpha)
+            tx, ty = math.cos(alpha), math.sin(alpha)  # tangent
+            nx, ny = math.sin(alpha), -math.cos(alpha)  # outward normal ("up" for the glyph)
+            origin_x, origin_y = px - tx * glyph_w / 2, py - ty * glyph_w / 2
+            transform = (scale * tx, scale * ty, scale * nx, scale * ny, origin_x, origin_y)
+            glyph_set[name].draw(TransformPen(pen, transform))
+            offset += advance
+        lines.append(f'<path class="{line.css_class}" d="{pen.getCommands()}"></path>')
+    return lines
+
+
+@lru_cache(maxsize=None)
+def arc_defs_html(arc: str) -> str:
+    # Document-level definitions the shared/outlined cards point at. Must
+    # appear once before the cards; repeating it (one per deck on a page) is
+    # harmless because every copy is identical.
+    if check_arc_mode(arc) == "inline":
+        return ""
+    if resolve_arc_mode(arc) == "outlined":
+        symbol_body = outlined_arc_lines(find_arc_font())
+        paths = []
+    else:
+        symbol_body = text_on_path_lines(("cs-arc-top", "cs-arc-bottom"))
+        paths = [
+            f'<path id="cs-arc-top" d="{arc_path(ARC_LINES[0])}" fill="none" stroke="none"></path>',
+            f'<path id="cs-arc-bottom" d="{arc_path(ARC_LINES[1])}" fill="none" stroke="none"></path>',
+        ]
+    return "\n".join(
+        [
+            '<svg class="cs-arc-defs" aria-hidden="true">',
+            "<defs>",
+            *paths,
+            f'<symbol id="cs-arc" viewBox="{ARC_VIEWBOX}">',
+            *symbol_body,
+            "</symbol>",
+            "</defs>",
+            "</svg>",
+        ]
+    )
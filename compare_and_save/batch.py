@@ -0,0 +1,143 @@
+# Compact deck of product rows.
+#
+# A ProductBatch keeps one list of names and the prices as integer cents in
+# array("q") columns, with Carries? as one byte per row, instead of a
+# dataclass instance (and its __dict__) per row. Indexing or iterating
+# yields BatchRows: slotted rows with ProductRow's attributes, repr,
+# equality and hash, so renderers, card ids and the card cache treat the
+# two alike.
+from __future__ import annotations
+
+from array import array
+import sys
+from typing import Iterable, Iterator, Sequence, overload
+
+from .model import ProductRow, to_cents
+
+CARRIES = ("Yes", "DNC")
+_CARRIES_CODES = {value: code for code, value in enumerate(CARRIES)}
+
+
+class BatchRow:
+    __slots__ = ("name", "super_one_cents", "competitor_cents", "carries")
+
+    def __init__(self, name: str, super_one_cents: int, competitor_cents: int, carries: str) -> None:
+        self.name = name
+        self.super_one_cents = super_one_cents
+        self.competitor_cents = competitor_cents
+        self.carries = carries
+
+    @property
+    def super_one_price(self) -> float:
+        return self.super_one_cents / 100
+
+    @property
+    def competitor_price(self) -> float:
+        return self.competitor_cents / 100
+
+    def _key(self) -> tuple[str, float, float, str]:
+        return (self.name, self.super_one_price, self.competitor_price, self.carries)
+
+    def to_row(self) -> ProductRow:
+        return ProductRow(*self._key())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BatchRow):
+            return self._key() == other._key()
+        if isinstance(other, ProductRow):
+            return self._key() == (other.name, other.super_one_price, other.competitor_price, other.carries)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Same as the frozen dataclass: the hash of the field tuple
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return repr(self.to_row())
+
+
+class ProductBatch:
+    __slots__ = ("names", "super_one_cents", "competitor_cents", "carries_codes")
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.super_one_cents = array("q")
+        self.competitor_cents = array("q")
+        self.carries_codes = bytearray()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[ProductRow]) -> ProductBatch:
+        batch = cls()
+        for row in rows:
+            batch.append(row.name, to_cents(row.super_one_price), to_cents(row.competitor_price), row.carries)
+        return batch
+
+    @classmethod
+    def from_columns(
+        cls, names: Sequence[str], super_one_cents: Iterable[int], competitor_cents: Iterable[int], carries: Iterable[str]
+    ) -> ProductBatch:
+        batch = cls()
+        batch.names = list(names)
+        batch.super_one_cents = array("q", super_one_cents)
+        batch.competitor_cents = array("q", competitor_cents)
+        batch.carries_codes = bytearray(_carries_code(value) for value in carries)
+        if not len(batch.names) == len(batch.super_one_cents) == len(batch.competitor_cents) == len(batch.carries_codes):
+            raise ValueError("batch columns must have the same length")
+        return batch
+
+    def append(self, name: str, super_one_cents: int, competitor_cents: int, carries: str) -> None:
+        self.carries_codes.append(_carries_code(carries))
+        self.names.append(name)
+        self.super_one_cents.append(super_one_cents)
+        self.competitor_cents.append(competitor_cents)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, index: int) -> BatchRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ProductBatch: ...
+
+    def __getitem__(self, index: int | slice) -> BatchRow | ProductBatch:
+        if isinstance(index, slice):
+            window = ProductBatch()
+            window.names = self.names[index]
+            window.super_one_cents = self.super_one_cents[index]
+            window.competitor_cents = self.competitor_cents[index]
+            window.carries_codes = self.carries_codes[index]
+            return window
+        return BatchRow(
+            self.names[index],
+            self.super_one_cents[index],
+            self.competitor_cents[index],
+            CARRIES[self.carries_codes[index]],
+        )
+
+    def __iter__(self) -> Iterator[BatchRow]:
+        for name, super_one, competitor, code in zip(
+            self.names, self.super_one_cents, self.competitor_cents, self.carries_codes
+        ):
+            yield BatchRow(name, super_one, competitor, CARRIES[code])
+
+    def rows(self) -> list[ProductRow]:
+        return [row.to_row() for row in self]
+
+    def nbytes(self) -> int:
+        # Columns plus the name strings (shared strings are counted once)
+        names = {id(name): sys.getsizeof(name) for name in self.names}
+        return (
+            sys.getsizeof(self.names)
+            + sum(names.values())
+            + sys.getsizeof(self.super_one_cents)
+            + sys.getsizeof(self.competitor_cents)
+            + sys.getsizeof(self.carries_codes)
+        )
+
+
+def _carries_code(carries: str) -> int:
+    try:
+        return _CARRIES_CODES[carries]
+    except KeyError:
+        raise ValueError(f"unrecognized Carries? value {carries!r} (expected Yes or DNC)") from None
@@ -0,0 +1,149 @@
+# Small thread-safe LRU cache with hit/miss counters and an optional memory
+# budget.
+#
+# Lives in an imported module (not the Streamlit script, which is re-executed
+# on every rerun) so entries are shared across reruns and sessions. The
+# process-wide caches register by name with shared_cache(), which is where
+# their memory budgets come from: COMPARE_AND_SAVE_<NAME>_CACHE_MB overrides
+# the default.
+from __future__ import annotations
+
+from collections import OrderedDict
+import os
+import sys
+import threading
+from typing import Any, Callable, Generic, Hashable, NamedTuple, TypeVar
+
+V = TypeVar("V")
+
+CACHE_MB_ENV = "COMPARE_AND_SAVE_{name}_CACHE_MB"
+MIB = 1024 * 1024
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    nbytes: int = 0  # as measured by the cache's sizeof
+    maxbytes: int | None = None
+
+
+class LRUCache(Generic[V]):
+    def __init__(
+        self, maxsize: int, *, maxbytes: int | None = None, sizeof: Callable[[V], int] = sys.getsizeof
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("maxbytes must be >= 0")
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._data: OrderedDict[Hashable, tuple[V, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        return self.lookup(key, factory)[0]
+
+    def lookup(self, key: Hashable, factory: Callable[[], V]) -> tuple[V, bool]:
+        # get_or_create that also says whether the value was already cached
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return value, True
+
+        # Build (and size) outside the lock; a concurrent miss on the same
+        # key just renders twice and the later value wins. A value bigger
+        # than the whole budget is returned but not kept.
+        value = factory()
+        if not self._maxsize:
+            return value, False
+        size = self._sizeof(value)
+        if self._maxbytes is not None and size > self._maxbytes:
+            return value, False
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._data[key] = (value, size)
+            self._nbytes += size
+            self._evict()
+        return value, False
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def limit_bytes(self, maxbytes: int | None) -> None:
+        # None lifts the budget
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("maxbytes must be >= 0")
+        with self._lock:
+            self._maxbytes = maxbytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._data), self._nbytes, self._maxbytes
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self._maxsize or (self._maxbytes is not None and self._nbytes > self._maxbytes)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._nbytes -= size
+
+
+_shared: dict[str, LRUCache[Any]] = {}
+_shared_lock = threading.Lock()
+
+
+def cache_budget(name: str, default_mb: float | None) -> int | None:
+    # Bytes for the named cache: its CACHE_MB env var, else default_mb
+    value = os.environ.get(CACHE_MB_ENV.format(name=name.upper()), "").strip()
+    megabytes = float(value) if value else default_mb
+    return None if megabytes is None else int(megabytes * MIB)
+
+
+def shared_cache(
+    name: str,
+    maxsize: int,
+    *,
+    maxbytes_mb: float | None = None,
+    sizeof: Callable[[Any], int] = sys.getsizeof,
+) -> LRUCache[Any]:
+    # The process-wide cache called `name`, created on first use
+    with _shared_lock:
+        cache = _shared.get(name)
+        if cache is None:
+            cache = _shared[name] = LRUCache(maxsize, maxbytes=cache_budget(name, maxbytes_mb), sizeof=sizeof)
+        return cache
+
+
+def shared_caches() -> dict[str, LRUCache[Any]]:
+    with _shared_lock:
+        return dict(_shared)
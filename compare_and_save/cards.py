@@ -0,0 +1,250 @@
+# Card HTML rendering
+from __future__ import annotations
+
+from datetime import date
+from functools import lru_cache
+import hashlib
+import html
+import operator
+import os
+import string
+from typing import MutableMapping, NamedTuple
+
+from .arcs import DEFAULT_ARC_MODE, card_arc_svg, check_arc_mode
+from .cache import LRUCache, shared_cache
+from .model import ProductRow, format_check_date, money, money_cents
+from .pricing import is_dnc, savings_cents
+
+CARD_CACHE_SIZE_ENV = "COMPARE_AND_SAVE_CARD_CACHE_SIZE"
+DEFAULT_CARD_CACHE_SIZE = 4096
+CARD_CACHE_MB = 32
+
+# Process-wide: unchanged cards are reused across reruns and sessions
+card_cache: LRUCache[str] = shared_cache(
+    "cards", int(os.environ.get(CARD_CACHE_SIZE_ENV, DEFAULT_CARD_CACHE_SIZE)), maxbytes_mb=CARD_CACHE_MB
+)
+
+
+@lru_cache(maxsize=64)
+def competitor_label_html(competitor: str) -> str:
+    # Excel template breaks Safeway/Albertsons across lines
+    if competitor.lower().startswith("safeway"):
+        return '<span class="cs-label-line1">Safeway/Albertsons</span><span class="cs-label-line2">Price</span>'
+    return f"{html.escape(competitor)} Price"
+
+
+class CardSlots(NamedTuple):
+    # The per-card values a compiled template is filled with, already
+    # escaped/formatted
+    uid: str  # only used by the inline arc
+    product: str
+    super_one_price: str
+    competitor_price: str
+    savings: str
+    date: str
+
+
+class ProductSlots(NamedTuple):
+    # The slots that don't depend on the competitor, so one product's cards
+    # in several decks can share them
+    product: str
+    super_one_price: str
+
+
+# product_slots by (name, Super 1 price), filled in as cards render
+SharedSlots = MutableMapping[tuple[str, float], ProductSlots]
+
+
+def product_slots(row: ProductRow, shared: SharedSlots | None = None) -> ProductSlots:
+    if shared is None:
+        return ProductSlots(html.escape(row.name), money(float(row.super_one_price)))
+    key = (row.name, row.super_one_price)
+    slots = shared.get(key)
+    if slots is None:
+        slots = shared[key] = product_slots(row)
+    return slots
+
+
+# Template source is str.format syntax: "{0}", "{1}", ... by slot name
+SLOT = {name: f"{{{index}}}" for index, name in enumerate(CardSlots._fields)}
+
+
+def _format_literal(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class CardTemplate:
+    # A template parsed once into its literal runs. Filling it drops the
+    # slot values between them and joins, with no per-call parsing (plain
+    # str.format re-parses the whole ~1 KB card every time).
+    __slots__ = ("_parts", "_values")
+
+    def __init__(self, source: str) -> None:
+        # Literal runs at even positions, slot values go in the odd ones
+        parts: list[str | None] = [""]
+        order: list[int] = []
+        for literal, field, _, _ in string.Formatter().parse(source):
+            parts[-1] += literal
+            if field is not None:
+                parts += [None, ""]
+                order.append(int(field))
+        self._parts = parts
+        self._values = operator.itemgetter(*order) if len(order) > 1 else lambda slots: tuple(slots[i] for i in order)
+
+    def fill(self, slots: CardSlots) -> str:
+        parts = self._parts.copy()
+        parts[1::2] = self._values(slots)
+        return "".join(parts)
+
+
+def super_one_block_lines(*, centered: bool) -> list[str]:
+    if centered:
+        return [
+            '<div class="cs-price-block cs-price-block-center">',
+            '<div class="cs-label cs-label-center">Super 1 Price</div>',
+            f'<div class="cs-price cs-price-center">{SLOT["super_one_price"]}</div>',
+            "</div>",
+        ]
+    return [
+        '<div class="cs-price-block">',
+        '<div class="cs-label">Super 1 Price</div>',
+        f'<div class="cs-price">{SLOT["super_one_price"]}</div>',
+        "</div>",
+    ]
+
+
+@lru_cache(maxsize=None)
+def card_template(competitor: str, arc: str, dnc: bool) -> CardTemplate:
+    # One card layout with the competitor's (pre-escaped) text baked in and
+    # a slot for every per-card value; see CardSlots
+    date_row = [
+        '<div class="cs-date-row">',
+        '<span class="cs-date-label">Price Check Date:</span>',
+        f'<span class="cs-date-val">{SLOT["date"]}</span>',
+        "</div>",
+    ]
+
+    # IMPORTANT: keep every line left-aligned. If we indent HTML in Markdown,
+    # Streamlit can interpret it as a code block and show raw tags.
+    left_html_lines: list[str]
+    right_html_lines: list[str]
+    if dnc:
+        # DNC: left side shows ONLY Super 1 Price, centered (no competitor label/price);
+        # right side becomes a message, no arc, no savings amount
+        left_html_lines = ['<div class="cs-left cs-left-dnc">', *super_one_block_lines(centered=True), "</div>"]
+        right_html_lines = [
+            '<div class="cs-right cs-right-dnc">',
+            '<div class="cs-dnc-big">',
+            f'<div class="cs-dnc-line1">{_format_literal(html.escape(competitor))}</div>',
+            '<div class="cs-dnc-line2">DOES NOT CARRY</div>',
+            "</div>",
+            *date_row,
+            "</div>",
+        ]
+    else:
+        # Normal: competitor and Super 1 prices | two-line arc + savings amount
+        left_html_lines = [
+            '<div class="cs-left">',
+            '<div class="cs-price-block">',
+            f'<div class="cs-label">{_format_literal(competitor_label_html(competitor))}</div>',
+            f'<div class="cs-price">{SLOT["competitor_price"]}</div>',
+            "</div>",
+            "",
+            *super_one_block_lines(centered=False),
+            "</div>",
+        ]
+        right_html_lines = [
+            '<div class="cs-right">',
+            *card_arc_svg(arc, SLOT["uid"]),
+            "",
+            f'<div class="cs-savings cs-savings-positive">{SLOT["savings"]}</div>',
+            "",
+            *date_row,
+            "</div>",
+        ]
+
+    source = "\n".join(
+        [
+            '<div class="cs-card">',
+            '<div class="cs-header">',
+            '<div class="cs-title">',
+            '<span class="cs-title-compare">Compare</span>',
+            '<span class="cs-title-and"><span>AND</span></span>',
+            '<span class="cs-title-save">Save</span>',
+            "</div>",
+            f'<div class="cs-product">{SLOT["product"]}</div>',
+            "</div>",
+            "",
+            '<div class="cs-body">',
+            *left_html_lines,
+            "",
+            '<div class="cs-divider" aria-hidden="true"></div>',
+            "",
+            *right_html_lines,
+            "</div>",
+            "</div>",
+        ]
+    )
+    return CardTemplate(source)
+
+
+@lru_cache(maxsize=64)
+def card_date_text(check_date: date) -> str:
+    return format_check_date(check_date)
+
+
+def render_card_html(
+    *,
+    competitor: str,
+    check_date: date,
+    row: ProductRow,
+    occurrence: int = 0,
+    arc: str = DEFAULT_ARC_MODE,
+    shared: SharedSlots | None = None,
+) -> str:
+    # `shared` is kept across the decks of one product list, so another
+    # competitor's card for the same product reuses its slots
+    dnc = is_dnc(row)
+    template = card_template(competitor, check_arc_mode(arc), dnc)
+    slots = product_slots(row, shared)
+    return template.fill(
+        CardSlots(
+            # Only the inline arc puts the card id in the markup
+            uid=card_id(competitor=competitor, check_date=check_date, row=row, occurrence=occurrence)
+            if arc == "inline" and not dnc
+            else "",
+            product=slots.product,
+            super_one_price=slots.super_one_price,
+            competitor_price="" if dnc else money(float(row.competitor_price)),
+            savings="" if dnc else money_cents(savings_cents(row)),
+            date=card_date_text(check_date),
+        )
+    )
+
+
+def card_id(*, competitor: str, check_date: date, row: ProductRow, occurrence: int = 0) -> str:
+    # Derived from the card's content so the same card always renders the same
+    # HTML. `occurrence` numbers repeats of an identical row within one deck,
+    # which keeps the inline-mode SVG path ids unique in the printed document.
+    key = f"{competitor}\x1f{check_date}\x1f{row!r}".encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=8).hexdigest()
+    return f"{digest}_{occurrence}" if occurrence else digest
+
+
+def cached_card_html(
+    *,
+    competitor: str,
+    check_date: date,
+    row: ProductRow,
+    occurrence: int = 0,
+    arc: str = DEFAULT_ARC_MODE,
+    shared: SharedSlots | None = None,
+) -> str:
+    if arc != "inline":
+        occurrence = 0  # only inline-arc cards carry their id, so repeats render alike
+    return card_cache.get_or_create(
+        (competitor, check_date, row, occurrence, arc),
+        lambda: render_card_html(
+            competitor=competitor, check_date=check_date, row=row, occurrence=occurrence, arc=arc, shared=shared
+        ),
+    )
@@ -0,0 +1,193 @@
+# Persistent product catalog and weekly price checks (SQLite).
+#
+# Products are keyed by a normalized name so "Tillamook Cheddar 2lb" and
+# "tillamook  cheddar 2LB" are the same product week to week. Saving a week
+# diffs against what is already stored and only writes the rows that changed.
+from __future__ import annotations
+
+from datetime import date
+import os
+from pathlib import Path
+import re
+import sqlite3
+import threading
+from typing import Iterable, NamedTuple
+
+from .model import PriceCheck
+
+CATALOG_PATH_ENV = "COMPARE_AND_SAVE_CATALOG"
+DEFAULT_CATALOG_PATH = "catalog.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS price_checks (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    check_date TEXT NOT NULL,
+    super_one_price REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (product_id, check_date)
+);
+CREATE TABLE IF NOT EXISTS competitor_prices (
+    product_id INTEGER NOT NULL,
+    check_date TEXT NOT NULL,
+    competitor TEXT NOT NULL,
+    price REAL NOT NULL,
+    carries TEXT NOT NULL,
+    PRIMARY KEY (product_id, check_date, competitor),
+    FOREIGN KEY (product_id, check_date) REFERENCES price_checks(product_id, check_date) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS price_checks_by_date ON price_checks(check_date);
+CREATE INDEX IF NOT EXISTS competitor_prices_by_date ON competitor_prices(check_date);
+"""
+
+
+class CatalogChanges(NamedTuple):
+    changed: list[PriceCheck]  # new or re-priced this week
+    removed: list[str]  # names dropped from this week's list
+    unchanged: int
+    duplicates: list[str]  # entries not saved: a later one has the same normalized name
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(re.sub(r"[^\w]+", " ", name.lower()).split())
+
+
+class Catalog:
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = Path(path or os.environ.get(CATALOG_PATH_ENV, DEFAULT_CATALOG_PATH))
+        # One connection shared by every Streamlit session thread, serialized by the lock
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA foreign_keys = ON")
+            self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> Catalog:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def check_dates(self) -> list[date]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT check_date FROM price_checks ORDER BY check_date").fetchall()
+        return [date.fromisoformat(value) for (value,) in rows]
+
+    def latest_date(self, on_or_before: date) -> date | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(check_date) FROM price_checks WHERE check_date <= ?", (on_or_before.isoformat(),)
+            ).fetchone()
+        return date.fromisoformat(row[0]) if row[0] else None
+
+    def load(self, check_date: date) -> list[PriceCheck]:
+        return [check for _, check in self._load_positioned(check_date.isoformat())]
+
+    def _load_positioned(self, key: str) -> list[tuple[int, PriceCheck]]:
+        with self._lock:
+            checks = self._db.execute(
+                "SELECT p.id, p.name, c.super_one_price, c.position FROM price_checks c "
+                "JOIN products p ON p.id = c.product_id WHERE c.check_date = ? ORDER BY c.position",
+                (key,),
+            ).fetchall()
+            prices = self._db.execute(
+                "SELECT product_id, competitor, price, carries FROM competitor_prices "
+                "WHERE check_date = ? ORDER BY product_id, competitor",
+                (key,),
+            ).fetchall()
+
+        by_product: dict[int, list[tuple[str, float, str]]] = {}
+        for product_id, competitor, price, carries in prices:
+            by_product.setdefault(product_id, []).append((competitor, price, carries))
+        return [
+            (
+                position,
+                PriceCheck(
+                    name=name,
+                    super_one_price=super_one_price,
+                    competitor_prices=tuple(by_product.get(product_id, ())),
+                ),
+            )
+            for product_id, name, super_one_price, position in checks
+        ]
+
+    def save(self, check_date: date, checks: Iterable[PriceCheck]) -> CatalogChanges:
+        # Replace the week's list with `checks`, writing only what changed.
+        # A repeated product name keeps its last entry; the others are
+        # reported in `duplicates`.
+        key = check_date.isoformat()
+        incoming: dict[str, tuple[int, PriceCheck]] = {}
+        duplicates: list[str] = []
+        for position, check in enumerate(checks):
+            norm = normalize_name(check.name)
+            if norm in incoming:
+                duplicates.append(incoming[norm][1].name)
+            incoming[norm] = (position, check)
+
+        stored_rows = self._load_positioned(key)
+        stored = {normalize_name(check.name): check for _, check in stored_rows}
+        stored_positions = {normalize_name(check.name): position for position, check in stored_rows}
+        changed = [
+            (norm, position, check)
+            for norm, (position, check) in incoming.items()
+            if _sorted_check(stored.get(norm)) != _sorted_check(check)
+        ]
+        removed = [norm for norm in stored if norm not in incoming]
+
+        with self._lock, self._db:
+            db = self._db
+            for norm in removed:
+                db.execute(
+                    "DELETE FROM price_checks WHERE check_date = ? AND product_id = "
+                    "(SELECT id FROM products WHERE normalized_name = ?)",
+                    (key, norm),
+                )
+            for norm, position, check in changed:
+                db.execute(
+                    "INSERT INTO products (name, normalized_name) VALUES (?, ?) "
+                    "ON CONFLICT (normalized_name) DO UPDATE SET name = excluded.name",
+                    (check.name, norm),
+                )
+                (product_id,) = db.execute("SELECT id FROM products WHERE normalized_name = ?", (norm,)).fetchone()
+                db.execute("DELETE FROM price_checks WHERE product_id = ? AND check_date = ?", (product_id, key))
+                db.execute(
+                    "INSERT INTO price_checks (product_id, check_date, super_one_price, position) VALUES (?, ?, ?, ?)",
+                    (product_id, key, check.super_one_price, position),
+                )
+                db.executemany(
+                    "INSERT INTO competitor_prices (product_id, check_date, competitor, price, carries) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(product_id, key, competitor, price, carries) for competitor, price, carries in check.competitor_prices],
+                )
+            # Unchanged rows that moved in the list only get their position updated
+            changed_names = {norm for norm, _, _ in changed}
+            db.executemany(
+                "UPDATE price_checks SET position = ? WHERE check_date = ? AND product_id = "
+                "(SELECT id FROM products WHERE normalized_name = ?)",
+                [
+                    (position, key, norm)
+                    for norm, (position, _) in incoming.items()
+                    if norm not in changed_names and stored_positions.get(norm) != position
+                ],
+            )
+
+        return CatalogChanges(
+            changed=[check for _, _, check in changed],
+            removed=[stored[norm].name for norm in removed],
+            unchanged=len(incoming) - len(changed),
+            duplicates=duplicates,
+        )
+
+
+def _sorted_check(check: PriceCheck | None) -> tuple | None:
+    # Comparison key that ignores the order of competitor entries
+    if check is None:
+        return None
+    return (check.name, check.super_one_price, tuple(sorted(check.competitor_prices)))
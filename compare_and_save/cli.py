@@ -0,0 +1,219 @@
+# Headless batch generator: price-list files in, print-ready decks out.
+#
+#   python -m compare_and_save store-12.csv store-31.xlsx --date 2026-10-18 --out decks/
+#   python -m compare_and_save stores/ --zip decks-2026-10-18.zip
+#
+# Each input file is one store (a directory stands for the price lists in
+# it); a file may carry one price column per competitor ("Winco Price",
+# "Safeway/Albertsons Price"). Every store is rendered for every requested
+# competitor and written as <out>/<store>_<competitor>.<format>, or under
+# that name into one zip archive. Stores fan out across a process pool.
+# Nothing here imports Streamlit or pandas, so the command starts in
+# milliseconds.
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import date
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Iterable, Iterator, Sequence
+import zipfile
+
+from .arcs import ARC_MODES, DEFAULT_ARC_MODE, OUTLINED_ARC_UNAVAILABLE, resolve_arc_mode
+from .importers import EXCEL_SUFFIXES, iter_price_checks
+from .model import COMPETITORS, ProductRow, competitor_slug
+from .pages import DeckSpool, iter_deck_cards, iter_pages_html, iter_print_document
+from .pdf import write_deck_pdf
+
+FORMATS = ("html", "pdf")
+PRICE_LIST_SUFFIXES = (".csv", *EXCEL_SUFFIXES)
+# PDF content streams are already deflated; compressing them again only costs time
+ZIP_COMPRESSION = {"html": zipfile.ZIP_DEFLATED, "pdf": zipfile.ZIP_STORED}
+
+
+def expand_price_lists(paths: Iterable[Path]) -> list[Path]:
+    # Directories stand for the price lists directly inside them
+    price_lists = []
+    for path in paths:
+        if path.is_dir():
+            price_lists += sorted(
+                child for child in path.iterdir() if child.is_file() and child.suffix.lower() in PRICE_LIST_SUFFIXES
+            )
+        else:
+            price_lists.append(path)
+    return price_lists
+
+
+def write_deck(
+    path: Path,
+    fmt: str,
+    rows: Iterable[ProductRow],
+    *,
+    competitor: str,
+    check_date: date,
+    arc: str = DEFAULT_ARC_MODE,
+) -> None:
+    if fmt == "html":
+        with open(path, "w", encoding="utf-8") as fp:
+            cards = iter_deck_cards(rows, competitor=competitor, check_date=check_date, arc=arc)
+            fp.writelines(iter_print_document(iter_pages_html(cards, arc=arc)))
+    elif fmt == "pdf":
+        with open(path, "wb") as fp:
+            write_deck_pdf(fp, rows, competitor=competitor, check_date=check_date)
+    else:
+        raise ValueError(f"unknown format {fmt!r}")
+
+
+def render_store(
+    price_list: Path,
+    out_dir: Path,
+    *,
+    competitors: Sequence[str],
+    check_date: date,
+    formats: Sequence[str],
+    arc: str = DEFAULT_ARC_MODE,
+) -> list[Path]:
+    # Streamed: the price list is read once into per-competitor spools and
+    # each deck is written a page at a time, so memory stays flat with size
+    written = []
+    with DeckSpool(iter_price_checks(price_list, competitors=competitors), competitors) as spool:
+        for competitor in competitors:
+            for fmt in formats:
+                path = out_dir / f"{price_list.stem}_{competitor_slug(competitor)}.{fmt}"
+                write_deck(path, fmt, spool.rows(competitor), competitor=competitor, check_date=check_date, arc=arc)
+                written.append(path)
+    return written
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m compare_and_save",
+        description="Render Compare and Save card decks from store price lists (CSV or Excel).",
+    )
+    parser.add_argument(
+        "price_lists", nargs="+", type=Path, help="one price-list file per store, or directories of them"
+    )
+    parser.add_argument(
+        "-c",
+        "--competitor",
+        dest="competitors",
+        action="append",
+        help=f"competitor to render (repeatable; default: {', '.join(COMPETITORS)})",
+    )
+    parser.add_argument(
+        "-d",
+        "--date",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="price check date as YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument("-o", "--out", type=Path, default=Path("."), help="output directory (default: .)")
+    parser.add_argument(
+        "-z", "--zip", type=Path, help="write every deck into this zip archive instead of the output directory"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="formats",
+        action="append",
+        choices=FORMATS,
+        help="output format (repeatable; default: html)",
+    )
+    parser.add_argument(
+        "--arc",
+        choices=ARC_MODES,
+        default=DEFAULT_ARC_MODE,
+        help="HTML arc artwork: one shared SVG symbol, the same pre-outlined, "
+        f"or per-card inline SVG (default: {DEFAULT_ARC_MODE})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default: CPU count; 1 renders in-process)",
+    )
+    return parser
+
+
+def iter_results(
+    price_lists: Sequence[Path], out_dir: Path, *, jobs: int, **options
+) -> Iterator[tuple[Path, list[Path] | Exception]]:
+    # (input, written files or the error) per store, in input order. Any
+    # failure is one store's: the others are still rendered.
+    if jobs == 1:
+        for path in price_lists:
+            try:
+                yield path, render_store(path, out_dir, **options)
+            except Exception as exc:
+                yield path, exc
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [(path, pool.submit(render_store, path, out_dir, **options)) for path in price_lists]
+        for path, future in futures:
+            try:
+                yield path, future.result()
+            except Exception as exc:
+                yield path, exc
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    price_lists = expand_price_lists(args.price_lists)
+    if not price_lists:
+        parser.error("no price lists found")
+    stems = [path.stem for path in price_lists]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        parser.error(f"more than one price list per store name: {', '.join(duplicates)}")
+    # Checked here rather than in the workers, so the warning is printed once
+    arc = resolve_arc_mode(args.arc)
+    if arc != args.arc:
+        print(f"warning: {OUTLINED_ARC_UNAVAILABLE}; using --arc {arc}", file=sys.stderr)
+
+    # With --zip, workers write into a scratch directory and each finished
+    # store is moved into the archive, so no deck is held in memory
+    with tempfile.TemporaryDirectory(prefix="compare-and-save-") if args.zip else nullcontext(None) as scratch:
+        out_dir = args.out if scratch is None else Path(scratch)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        failures = written = 0
+        with zipfile.ZipFile(args.zip, "w") if args.zip else nullcontext(None) as archive:
+            results = iter_results(
+                price_lists,
+                out_dir,
+                jobs=max(1, min(args.jobs, len(price_lists))),
+                competitors=args.competitors or list(COMPETITORS),
+                check_date=args.date,
+                formats=args.formats or ["html"],
+                arc=arc,
+            )
+            for path, outcome in results:
+                if isinstance(outcome, Exception):
+                    failures += 1
+                    print(f"error: {path}: {outcome}", file=sys.stderr)
+                    continue
+                for out_path in outcome:
+                    written += 1
+                    if archive is None:
+                        print(out_path)
+                        continue
+                    archive.write(out_path, out_path.name, compress_type=ZIP_COMPRESSION[out_path.suffix[1:]])
+                    out_path.unlink()
+                    print(f"{args.zip}:{out_path.name}")
+
+    elapsed = time.perf_counter() - start
+    stores = len(price_lists) - failures
+    print(
+        f"{written} file(s) from {stores} store(s) in {elapsed:.2f}s ({stores / elapsed:.1f} stores/s)",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
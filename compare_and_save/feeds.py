@@ -0,0 +1,268 @@
+# Watch-folder ingestion of competitor price feeds.
+#
+# Price checkers drop shelf-price exports into a folder: CSV/Excel sheets
+# with a product name column and "<competitor> Price" / "<competitor>
+# Carries?" columns, or a single Competitor Price column in a file named
+# after the competitor ("winco-oct-18.csv"). A FeedWatcher polls the folder
+# from a background thread, re-reads only the files that are new or
+# changed since the last poll, and keeps their merged prices keyed by
+# normalized product name. Readers compare `version` to pick up changes.
+from __future__ import annotations
+
+from datetime import datetime
+from itertools import islice
+import os
+from pathlib import Path
+import threading
+from typing import Iterable, Iterator, Mapping, NamedTuple, Sequence
+
+from .catalog import normalize_name
+from .importers import (
+    EXCEL_SUFFIXES,
+    HEADER_SCAN_ROWS,
+    PriceListError,
+    PriceListSource,
+    iter_records,
+    normalize_carries,
+    normalize_header,
+    parse_price,
+    resolve_columns,
+    resolve_competitor_columns,
+)
+from .model import COMPETITORS
+
+DEFAULT_POLL_SECONDS = 2.0
+FEED_SUFFIXES = (".csv", *EXCEL_SUFFIXES)
+
+# (normalize_name(product), competitor) -> (price, carries)
+FeedPrices = Mapping[tuple[str, str], tuple[float, str]]
+
+
+class FeedPrice(NamedTuple):
+    name: str
+    competitor: str
+    price: float
+    carries: str
+
+
+class FeedSnapshot(NamedTuple):
+    version: int  # bumped whenever a file is added, changed or removed
+    prices: FeedPrices  # later files win where two price the same product
+    files: int
+    errors: dict[str, str]  # file name -> why its latest version was not read
+    changed: tuple[str, ...]  # files read or dropped by the last change
+    updated_at: datetime | None
+
+
+def feed_competitor(name: str, competitors: Iterable[str] = COMPETITORS) -> str | None:
+    # The competitor a file's name mentions ("Winco", "safeway", ...)
+    words = set(normalize_header(Path(name).stem.replace("_", " ").replace("-", " ")).split())
+    for competitor in competitors:
+        names = {normalize_header(part) for part in (competitor, *competitor.split("/"))} - {""}
+        if any(set(alias.split()) <= words for alias in names):
+            return competitor
+    return None
+
+
+def iter_feed_prices(
+    source: PriceListSource,
+    *,
+    name: str | None = None,
+    competitors: Iterable[str] = COMPETITORS,
+    competitor: str | None = None,
+) -> Iterator[FeedPrice]:
+    # `competitor` owns a generic Competitor Price / Price column; by
+    # default the one the file name mentions
+    if name is None:
+        name = os.fspath(source) if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    competitors = list(competitors)
+    records = iter_records(source, name=name)
+
+    for line_number, header in enumerate(islice(records, HEADER_SCAN_ROWS), start=1):
+        mapping = resolve_columns(header)
+        if "name" not in mapping:
+            continue
+        # Only competitors with their own columns, unless the file is named
+        # after one competitor and has a Competitor Price (or plain Price) column
+        generic = mapping.get("competitor_price")
+        columns = {
+            listed: (price, carries)
+            for listed, (price, carries) in resolve_competitor_columns(header, competitors, mapping).items()
+            if price is not None and price != generic
+        }
+        named = competitor or feed_competitor(str(name), competitors)
+        if not columns and named is not None:
+            if generic is None:
+                generic = resolve_columns(header, {"competitor_price": "price"}).get("competitor_price")
+            if generic is not None:
+                columns = {named: (generic, mapping.get("carries"))}
+        if columns:
+            break
+    else:
+        raise PriceListError(
+            f"no header row with Product Name and competitor price columns in the first {HEADER_SCAN_ROWS} rows"
+        )
+
+    name_col = mapping["name"]
+
+    def cell(record: Sequence[object], index: int | None) -> object:
+        value = record[index] if index is not None and index < len(record) else None
+        return None if isinstance(value, str) and not value.strip() else value
+
+    for line_number, record in enumerate(records, start=line_number + 1):
+        product = cell(record, name_col)
+        if product is None:
+            continue
+        try:
+            for owner, (price_col, carries_col) in columns.items():
+                value, carries = cell(record, price_col), cell(record, carries_col)
+                # A blank price and Carries? means the shelf was not checked
+                if value is None and carries is None:
+                    continue
+                carries = normalize_carries(carries)
+                if isinstance(value, str) and value.strip().upper() == "DNC":
+                    carries = "DNC"
+                yield FeedPrice(str(product).strip(), owner, parse_price(value), carries)
+        except PriceListError as exc:
+            raise PriceListError(f"row {line_number}: {exc}") from None
+
+
+def read_feed_prices(
+    source: PriceListSource, *, name: str | None = None, competitors: Iterable[str] = COMPETITORS
+) -> dict[tuple[str, str], tuple[float, str]]:
+    return {
+        (normalize_name(price.name), price.competitor): (price.price, price.carries)
+        for price in iter_feed_prices(source, name=name, competitors=competitors)
+    }
+
+
+class _FeedFile(NamedTuple):
+    stamp: tuple[int, int]  # (mtime_ns, size)
+    prices: dict[tuple[str, str], tuple[float, str]]
+
+
+class FeedWatcher:
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        competitors: Iterable[str] = COMPETITORS,
+        interval: float = DEFAULT_POLL_SECONDS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.competitors = list(competitors)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._polling = threading.Lock()
+        self._files: dict[str, _FeedFile] = {}
+        self._prices: dict[tuple[str, str], tuple[float, str]] = {}
+        self._errors: dict[str, str] = {}
+        self._version = 0
+        self._changed: tuple[str, ...] = ()
+        self._updated_at: datetime | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        stamps = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                # Skip hidden files and Excel's "~$" lock files
+                if entry.name.startswith((".", "~$")) or not entry.name.lower().endswith(FEED_SUFFIXES):
+                    continue
+                if entry.is_file():
+                    stat = entry.stat()
+                    stamps[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def poll(self) -> list[str]:
+        # One pass over the folder; returns the files read or dropped
+        with self._polling:
+            return self._poll()
+
+    def _poll(self) -> list[str]:
+        try:
+            stamps = self.scan()
+        except OSError as exc:
+            with self._lock:
+                self._errors[str(self.directory)] = str(exc)
+            return []
+        with self._lock:
+            self._errors.pop(str(self.directory), None)
+        known = self._files
+        changed = [name for name, stamp in stamps.items() if name not in known or known[name].stamp != stamp]
+        removed = [name for name in known if name not in stamps]
+        if not changed and not removed:
+            return []
+
+        # Parse outside the lock: a half-written file fails or comes out
+        # short, and is read again once its size or mtime moves on
+        files = dict(known)
+        errors: dict[str, str | None] = {name: None for name in removed}
+        for name in removed:
+            del files[name]
+        for name in changed:
+            # Any failure is this file's: keep its last good prices
+            try:
+                prices = read_feed_prices(self.directory / name, competitors=self.competitors)
+            except Exception as exc:
+                prices = known[name].prices if name in known else {}
+                errors[name] = str(exc) or type(exc).__name__
+            else:
+                errors[name] = None
+            files[name] = _FeedFile(stamps[name], prices)
+
+        merged: dict[tuple[str, str], tuple[float, str]] = {}
+        for _, feed in sorted(files.items(), key=lambda item: (item[1].stamp[0], item[0])):
+            merged.update(feed.prices)
+        with self._lock:
+            self._files = files
+            self._prices = merged
+            for name, error in errors.items():
+                if error is None:
+                    self._errors.pop(name, None)
+                else:
+                    self._errors[name] = error
+            self._changed = tuple(sorted(changed + removed))
+            self._updated_at = datetime.now()
+            self._version += 1
+        return sorted(changed + removed)
+
+    def snapshot(self) -> FeedSnapshot:
+        with self._lock:
+            return FeedSnapshot(
+                self._version, self._prices, len(self._files), dict(self._errors), self._changed, self._updated_at
+            )
+
+    def start(self) -> FeedWatcher:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"feed-watcher:{self.directory}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self) -> FeedWatcher:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        # One bad poll is reported and retried, never the end of the thread
+        while True:
+            try:
+                self.poll()
+            except Exception as exc:
+                with self._lock:
+                    self._errors[str(self.directory)] = f"poll failed: {exc or type(exc).__name__}"
+            if self._stop.wait(self.interval):
+                return
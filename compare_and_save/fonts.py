@@ -0,0 +1,150 @@
+# Card fonts, inlined into the stylesheet as base64 @font-face rules.
+#
+# Font files are looked up in compare_and_save/fonts/ (and the directory in
+# COMPARE_AND_SAVE_FONT_DIR, which wins). With fontTools installed each face
+# is subset to the glyphs the cards draw in it and re-encoded as WOFF2, so
+# print windows paint with the right fonts offline and without a network
+# round trip. Subsets are cached on disk by content hash, and the rules are
+# built once per process.
+from __future__ import annotations
+
+import base64
+from functools import lru_cache
+import hashlib
+import importlib.util
+import io
+import os
+from pathlib import Path
+import string
+import tempfile
+from typing import NamedTuple
+
+FONT_DIR_ENV = "COMPARE_AND_SAVE_FONT_DIR"
+FONT_CACHE_DIR_ENV = "COMPARE_AND_SAVE_FONT_CACHE_DIR"
+BUNDLED_FONT_DIR = Path(__file__).with_name("fonts")
+
+# Used only when no Caveat file is available, so online machines keep the
+# handwritten labels
+CAVEAT_FALLBACK_IMPORT = "@import url('https://fonts.googleapis.com/css2?family=Caveat:wght@600;700&display=swap');"
+
+
+class FontFace(NamedTuple):
+    family: str
+    weight: str  # CSS font-weight descriptor; a range keeps browsers from faking bold
+    files: tuple[str, ...]  # candidate file names, first match wins
+    text: str  # every character the cards draw in this face
+    axes: tuple[tuple[str, float], ...] = ()  # variable-font axes pinned before subsetting
+
+
+FONT_FACES = (
+    # Competitor labels ("Super 1 Price", "Winco Price", ...)
+    FontFace(
+        "Caveat",
+        "400 700",
+        ("Caveat-Bold.woff2", "Caveat-Bold.ttf", "Caveat[wght].ttf", "Caveat-VariableFont_wght.ttf"),
+        string.ascii_letters + string.digits + string.punctuation + " ",
+        (("wght", 700),),  # .cs-label is the only Caveat text
+    ),
+    # "Compare AND Save" title
+    FontFace(
+        "Cooper Black",
+        "400 900",
+        ("CooperBlack.woff2", "CooperBlack.ttf", "CooperBlack-Regular.ttf", "COOPBL.TTF", "Cooper Black.ttf"),
+        "CompareANDSave",
+    ),
+)
+
+_FORMATS = {b"wOF2": ("woff2", "font/woff2"), b"wOFF": ("woff", "font/woff"), b"OTTO": ("opentype", "font/otf")}
+
+
+def font_dirs() -> list[Path]:
+    extra = os.environ.get(FONT_DIR_ENV)
+    return ([Path(extra)] if extra else []) + [BUNDLED_FONT_DIR]
+
+
+def find_font(face: FontFace) -> Path | None:
+    for directory in font_dirs():
+        for file_name in face.files:
+            path = directory / file_name
+            if path.is_file():
+                return path
+    return None
+
+
+def font_format(data: bytes) -> tuple[str, str]:
+    # (CSS format() name, MIME type), sniffed from the file signature
+    return _FORMATS.get(data[:4], ("truetype", "font/ttf"))
+
+
+def font_cache_dir() -> Path:
+    return Path(os.environ.get(FONT_CACHE_DIR_ENV) or Path(tempfile.gettempdir()) / "compare_and_save-fonts")
+
+
+def subset_font(data: bytes, text: str, axes: tuple[tuple[str, float], ...] = ()) -> bytes:
+    # Without fontTools the file is inlined whole. A variable font is first
+    # pinned at `axes` (where it has them), dropping the other instances.
+    if importlib.util.find_spec("fontTools") is None:
+        return data
+    flavor = "woff2" if importlib.util.find_spec("brotli") is not None else "woff"
+    pinned = ",".join(f"{tag}={value:g}" for tag, value in axes)
+    key = hashlib.blake2b(
+        b"\x1f".join((data, text.encode(), flavor.encode(), pinned.encode())), digest_size=16
+    ).hexdigest()
+    cached = font_cache_dir() / f"{key}.{flavor}"
+    try:
+        return cached.read_bytes()
+    except OSError:
+        pass
+
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = flavor
+    font = TTFont(io.BytesIO(data))
+    if "fvar" in font:
+        from fontTools.varLib.instancer import instantiateVariableFont
+
+        supported = {axis.axisTag for axis in font["fvar"].axes}
+        limits = {tag: value for tag, value in axes if tag in supported}
+        if limits:
+            font = instantiateVariableFont(font, limits)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    subset.save_font(font, out, options)
+    subsetted = out.getvalue()
+
+    # Write-then-rename so concurrent CLI workers never read a partial file
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        partial = cached.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_bytes(subsetted)
+        os.replace(partial, cached)
+    except OSError:
+        pass
+    return subsetted
+
+
+def font_face_rule(face: FontFace, data: bytes) -> str:
+    css_format, mime = font_format(data)
+    encoded = base64.b64encode(data).decode("ascii")
+    return (
+        f'  @font-face {{ font-family: "{face.family}"; font-weight: {face.weight}; font-display: block; '
+        f'src: url(data:{mime};base64,{encoded}) format("{css_format}"); }}'
+    )
+
+
+@lru_cache(maxsize=None)
+def font_face_css() -> str:
+    rules = []
+    for face in FONT_FACES:
+        path = find_font(face)
+        if path is not None:
+            rules.append(font_face_rule(face, subset_font(path.read_bytes(), face.text, face.axes)))
+        elif face.family == "Caveat":
+            rules.append(f"  {CAVEAT_FALLBACK_IMPORT}")
+    # @import has to come before every other rule
+    rules.sort(key=lambda rule: not rule.lstrip().startswith("@import"))
+    return "\n".join(rules)
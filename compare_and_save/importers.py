@@ -0,0 +1,292 @@
+# Price-list import from CSV/XLSX files shaped like the weekly Excel template.
+#
+# Files are read row by row (csv module / openpyxl read-only mode) and turned
+# into ProductRows in fixed-size chunks, so catalogs of any length can be
+# imported without holding the raw sheet in memory or creating widgets.
+from __future__ import annotations
+
+import csv
+import io
+from itertools import islice
+import os
+import re
+from typing import IO, Iterable, Iterator, Mapping, Sequence, TypeVar, Union
+
+from .model import COMPETITORS, PriceCheck, ProductRow
+
+PriceListSource = Union[str, "os.PathLike[str]", IO[bytes]]
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 1000
+HEADER_SCAN_ROWS = 10
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+# Recognized header spellings (compared after normalize_header)
+COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    "name": ("product name", "product", "item", "item name", "name", "description"),
+    "super_one_price": ("super 1 price", "super one price", "super1 price", "super 1", "super1", "our price"),
+    # Competitor-specific columns ("Winco Price") are matched by competitor_headers()
+    "competitor_price": ("competitor price", "competitor", "comp price"),
+    "carries": ("carries", "carries?", "carry", "does competitor carry"),
+}
+REQUIRED_FIELDS = ("name", "super_one_price")
+
+CARRIES_VALUES = {
+    "": "Yes",
+    "yes": "Yes",
+    "y": "Yes",
+    "true": "Yes",
+    "1": "Yes",
+    "x": "Yes",
+    "carries": "Yes",
+    "dnc": "DNC",
+    "no": "DNC",
+    "n": "DNC",
+    "false": "DNC",
+    "0": "DNC",
+    "does not carry": "DNC",
+}
+
+_PRICE_JUNK = re.compile(r"[$,\s]")
+
+
+class PriceListError(ValueError):
+    pass
+
+
+def normalize_header(value: object) -> str:
+    text = "" if value is None else str(value)
+    return " ".join(re.sub(r"[^0-9a-z?]+", " ", text.lower()).split())
+
+
+def normalize_carries(value: object) -> str:
+    key = "" if value is None else str(value).strip().lower()
+    try:
+        return CARRIES_VALUES[key]
+    except KeyError:
+        raise PriceListError(f"unrecognized Carries? value {value!r} (expected Yes or DNC)") from None
+
+
+def parse_price(value: object) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = _PRICE_JUNK.sub("", str(value))
+    if not text or text.upper() in ("DNC", "N/A", "NA", "-"):
+        return 0.0
+    try:
+        return float(text)
+    except ValueError:
+        raise PriceListError(f"unrecognized price {value!r}") from None
+
+
+def _header_positions(header: Sequence[object]) -> dict[str, int]:
+    # First occurrence wins when a header is repeated
+    return {normalize_header(cell): index for index, cell in reversed(list(enumerate(header)))}
+
+
+def _find(positions: Mapping[str, int], aliases: Iterable[str]) -> int | None:
+    for alias in aliases:
+        index = positions.get(normalize_header(alias))
+        if index is not None:
+            return index
+    return None
+
+
+def resolve_columns(header: Sequence[object], overrides: Mapping[str, str] | None = None) -> dict[str, int]:
+    # Map ProductRow fields to column positions; `overrides` maps a field to
+    # the exact header text used by an unusual sheet.
+    positions = _header_positions(header)
+    columns: dict[str, int] = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        index = _find(positions, (overrides[field],) if overrides and field in overrides else aliases)
+        if index is not None:
+            columns[field] = index
+    return columns
+
+
+def competitor_headers(competitor: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    # Price and Carries? headers for one competitor, e.g. "Winco Price" and
+    # "Winco Carries?"; "Safeway/Albertsons" also matches either name alone.
+    names = [normalize_header(competitor), *(normalize_header(part) for part in competitor.split("/"))]
+    names = list(dict.fromkeys(name for name in names if name))
+    price = tuple(f"{name} price" for name in names) + tuple(names)
+    carries = tuple(header for name in names for header in (f"{name} carries?", f"{name} carries"))
+    return price, carries
+
+
+def resolve_competitor_columns(
+    header: Sequence[object],
+    competitors: Iterable[str],
+    generic: Mapping[str, int],
+) -> dict[str, tuple[int | None, int | None]]:
+    # (price column, carries column) per competitor. A sheet without
+    # competitor-specific columns is a single-competitor list, so its generic
+    # Competitor Price / Carries? columns apply to whichever competitor is
+    # asked for; a generic Carries? column also backs up a lone "Winco Price".
+    positions = _header_positions(header)
+    columns: dict[str, tuple[int | None, int | None]] = {}
+    for competitor in competitors:
+        price_aliases, carries_aliases = competitor_headers(competitor)
+        price = _find(positions, price_aliases)
+        if price is None:
+            columns[competitor] = (generic.get("competitor_price"), generic.get("carries"))
+        else:
+            carries = _find(positions, carries_aliases)
+            columns[competitor] = (price, generic.get("carries") if carries is None else carries)
+    return columns
+
+
+def _iter_csv_records(source: PriceListSource) -> Iterator[Sequence[object]]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8-sig") as fp:
+            yield from csv.reader(fp)
+        return
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()
+
+
+def _iter_excel_records(source: PriceListSource) -> Iterator[Sequence[object]]:
+    try:
+        import openpyxl
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError("Reading .xlsx price lists requires openpyxl (pip install openpyxl)") from exc
+
+    # A damaged or half-written workbook can fail in the zip, XML or
+    # openpyxl layers, on opening or part-way through the rows
+    try:
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except OSError:
+        raise
+    except Exception as exc:
+        raise PriceListError(f"unreadable Excel workbook: {exc or type(exc).__name__}") from None
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    except Exception as exc:
+        raise PriceListError(f"unreadable Excel workbook: {exc or type(exc).__name__}") from None
+    finally:
+        workbook.close()
+
+
+def iter_records(source: PriceListSource, *, name: str | None = None) -> Iterator[Sequence[object]]:
+    # Unreadable files raise PriceListError like bad rows do, so callers
+    # report them per file instead of crashing
+    if name is None:
+        name = os.fspath(source) if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    if str(name).lower().endswith(EXCEL_SUFFIXES):
+        yield from _iter_excel_records(source)
+        return
+    try:
+        yield from _iter_csv_records(source)
+    except UnicodeDecodeError as exc:
+        raise PriceListError(f'not UTF-8 text (byte {exc.start}); in Excel, save it as "CSV UTF-8"') from None
+    except csv.Error as exc:
+        raise PriceListError(f"unreadable CSV: {exc}") from None
+
+
+def iter_price_checks(
+    source: PriceListSource,
+    *,
+    name: str | None = None,
+    competitors: Iterable[str] = COMPETITORS,
+    columns: Mapping[str, str] | None = None,
+) -> Iterator[PriceCheck]:
+    records = iter_records(source, name=name)
+
+    # The template may have a title block above the header row
+    for line_number, header in enumerate(islice(records, HEADER_SCAN_ROWS), start=1):
+        mapping = resolve_columns(header, columns)
+        if all(field in mapping for field in REQUIRED_FIELDS):
+            break
+    else:
+        raise PriceListError(
+            f"no header row with {' and '.join(COLUMN_ALIASES[f][0].title() for f in REQUIRED_FIELDS)} columns "
+            f"in the first {HEADER_SCAN_ROWS} rows"
+        )
+
+    name_col = mapping["name"]
+    super_col = mapping["super_one_price"]
+    competitor_cols = resolve_competitor_columns(header, competitors, mapping)
+
+    def cell(record: Sequence[object], index: int | None) -> object:
+        return record[index] if index is not None and index < len(record) else None
+
+    def competitor_entry(record: Sequence[object], competitor: str) -> tuple[str, float, str]:
+        price_col, carries_col = competitor_cols[competitor]
+        value = cell(record, price_col)
+        carries = normalize_carries(cell(record, carries_col))
+        if price_col is None or (isinstance(value, str) and value.strip().upper() == "DNC"):
+            carries = "DNC"
+        return competitor, parse_price(value), carries
+
+    for line_number, record in enumerate(records, start=line_number + 1):
+        product = cell(record, name_col)
+        product = "" if product is None else str(product).strip()
+        if not product:
+            continue
+        try:
+            yield PriceCheck(
+                name=product,
+                super_one_price=parse_price(cell(record, super_col)),
+                competitor_prices=tuple(competitor_entry(record, competitor) for competitor in competitor_cols),
+            )
+        except PriceListError as exc:
+            raise PriceListError(f"row {line_number}: {exc}") from None
+
+
+def iter_price_list(
+    source: PriceListSource,
+    *,
+    competitor: str = COMPETITORS[0],
+    name: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> Iterator[ProductRow]:
+    for check in iter_price_checks(source, name=name, competitors=[competitor], columns=columns):
+        yield check.row_for(competitor)
+
+
+def iter_chunks(items: Iterable[T], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list[T]]:
+    items = iter(items)
+    while chunk := list(islice(items, chunk_size)):
+        yield chunk
+
+
+def iter_price_list_chunks(
+    source: PriceListSource,
+    *,
+    competitor: str = COMPETITORS[0],
+    name: str | None = None,
+    columns: Mapping[str, str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[ProductRow]]:
+    return iter_chunks(iter_price_list(source, competitor=competitor, name=name, columns=columns), chunk_size)
+
+
+def read_price_checks(
+    source: PriceListSource,
+    *,
+    name: str | None = None,
+    competitors: Iterable[str] = COMPETITORS,
+    columns: Mapping[str, str] | None = None,
+) -> list[PriceCheck]:
+    checks: list[PriceCheck] = []
+    for chunk in iter_chunks(iter_price_checks(source, name=name, competitors=competitors, columns=columns)):
+        checks.extend(chunk)
+    return checks
+
+
+def read_price_list(
+    source: PriceListSource,
+    *,
+    competitor: str = COMPETITORS[0],
+    name: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> list[ProductRow]:
+    rows: list[ProductRow] = []
+    for chunk in iter_price_list_chunks(source, competitor=competitor, name=name, columns=columns):
+        rows.extend(chunk)
+    return rows
@@ -0,0 +1,262 @@
+# Fuzzy pairing of Super 1 product names with a competitor's.
+#
+# Names are free text and every store spells them its own way ("Tillamook
+# Cheddar 2lb" vs "TILLAMOOK MED CHED 32OZ"). Each name becomes a set of
+# features: its words, each word's first three letters ("ched" meets
+# "cheddar") and first three consonants ("prtzls" meets "pretzels"), and
+# one canonical package size ("2lb", "1 qt" and "32oz" are all 32oz).
+# Features are TF-IDF weighted over the competitor catalog and a pair's
+# score is the cosine of their vectors, 0 to 1.
+#
+# NameIndex keeps the competitor catalog as postings lists (feature ->
+# competitor items) in numpy arrays. A block of Super 1 names first walks
+# the postings of its selective features (in at most `max_df` names, plus
+# each name's rarest few) to find candidates; the best candidates are then
+# scored exactly, common features included. A 50,000 x 50,000 join thus
+# touches the pairs that share a rare feature instead of all 2.5 billion.
+from __future__ import annotations
+
+import math
+import re
+from typing import Iterable, NamedTuple, Sequence
+
+import numpy as np
+
+DEFAULT_MIN_SCORE = 0.5
+DEFAULT_MAX_DF = 0.002  # fraction of the catalog (or a count, if >= 1)
+MIN_MAX_DF = 30
+RAREST_WALKED = 1  # features walked per name whatever their df
+CANDIDATES = 32  # per name, scored exactly
+PREFIX_LENGTH = 3
+PREFIX_WEIGHT = 0.5
+SIZE_WEIGHT = 1.5
+QUERY_BLOCK = 2048
+
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|[a-z]+")
+_VOWELS = re.compile(r"[aeiou]+")
+_REPEATS = re.compile(r"(.)\1+")
+
+# Unit -> (canonical unit, factor). Shelf tags write "oz" for weight and
+# volume alike, so both become ounces.
+UNITS: dict[str, tuple[str, float]] = {
+    **dict.fromkeys(("oz", "ounce", "ounces", "floz"), ("oz", 1.0)),
+    **dict.fromkeys(("lb", "lbs", "pound", "pounds"), ("oz", 16.0)),
+    **dict.fromkeys(("g", "gr", "gram", "grams"), ("oz", 1 / 28.349523125)),
+    **dict.fromkeys(("kg", "kilo", "kilogram", "kilograms"), ("oz", 1000 / 28.349523125)),
+    **dict.fromkeys(("gal", "gallon", "gallons"), ("oz", 128.0)),
+    **dict.fromkeys(("qt", "quart", "quarts"), ("oz", 32.0)),
+    **dict.fromkeys(("pt", "pint", "pints"), ("oz", 16.0)),
+    **dict.fromkeys(("ml",), ("oz", 1 / 29.5735295625)),
+    **dict.fromkeys(("l", "lt", "ltr", "liter", "liters", "litre", "litres"), ("oz", 1000 / 29.5735295625)),
+    **dict.fromkeys(("ct", "count", "pk", "pack", "ea"), ("ct", 1.0)),
+}
+
+
+class NameMatch(NamedTuple):
+    super_one: int  # index into the Super 1 names
+    competitor: int  # index into the competitor catalog
+    score: float
+
+
+def consonants(word: str) -> str:
+    # "pretzels" -> "prtzls", "butter" -> "btr": how abbreviations drop letters
+    return word[0] + _REPEATS.sub(r"\1", _VOWELS.sub("", word[1:]))
+
+
+def name_features(name: str) -> list[str]:
+    # Words as-is, "che~" prefixes, "chd^" consonants and one "#32oz" size
+    tokens = _TOKEN.findall(name.lower().replace("'", ""))
+    features: list[str] = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token[0].isdigit() and i + 1 < len(tokens):
+            unit, skip = tokens[i + 1], 2
+            if unit == "fl" and i + 2 < len(tokens) and tokens[i + 2] == "oz":
+                unit, skip = "floz", 3
+            if unit in UNITS:
+                canonical, factor = UNITS[unit]
+                features.append(f"#{round(float(token) * factor, 1):g}{canonical}")
+                i += skip
+                continue
+        features.append(token)
+        if not token[0].isdigit() and len(token) >= PREFIX_LENGTH:
+            features.append(token[:PREFIX_LENGTH] + "~")
+            features.append(consonants(token)[:PREFIX_LENGTH] + "^")
+        i += 1
+    return list(dict.fromkeys(features))
+
+
+def _feature_weight(feature: str) -> float:
+    if feature[0] == "#":
+        return SIZE_WEIGHT
+    return PREFIX_WEIGHT if feature[-1] in "~^" else 1.0
+
+
+class NameIndex:
+    def __init__(self, names: Sequence[str], *, max_df: float = DEFAULT_MAX_DF) -> None:
+        self.names = list(names)
+        self._ids: dict[str, int] = {}
+        items: list[int] = []
+        features: list[int] = []
+        for item, name in enumerate(self.names):
+            for feature in name_features(name):
+                items.append(item)
+                features.append(self._ids.setdefault(feature, len(self._ids)))
+        item_ids = np.asarray(items, dtype=np.int64)
+        feature_ids = np.asarray(features, dtype=np.int64)
+
+        count = len(self.names)
+        df = np.bincount(feature_ids, minlength=len(self._ids))
+        self._df = df
+        self._idf = np.log((count + 1) / (df + 1)) + 1
+        self._unseen_idf = math.log(count + 1) + 1
+        self._scale = np.array([_feature_weight(feature) for feature in self._ids]) * self._idf
+        self._max_df = max_df if max_df >= 1 else max(MIN_MAX_DF, int(max_df * count))
+
+        # Unit-length vectors, stored both as postings lists (by feature)
+        # and as sorted item * features + feature keys (by item)
+        weights = self._scale[feature_ids]
+        norms = np.sqrt(np.bincount(item_ids, weights=weights**2, minlength=count))
+        weights /= norms[item_ids]
+        order = np.argsort(feature_ids, kind="stable")
+        self._items = item_ids[order]
+        self._weights = weights[order]
+        self._indptr = np.concatenate(([0], np.cumsum(df)))
+        keys = item_ids * len(self._ids) + feature_ids
+        order = np.argsort(keys)
+        self._item_keys = keys[order]
+        self._item_weights = weights[order]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _query(self, names: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # (query, feature, weight, walk) per known feature of a block of
+        # names, weights divided by each name's length
+        queries: list[int] = []
+        features: list[int] = []
+        weights: list[float] = []
+        walk: list[bool] = []
+        norms = np.zeros(len(names))
+        for query, name in enumerate(names):
+            total = 0.0
+            known = []
+            for feature in name_features(name):
+                feature_id = self._ids.get(feature)
+                if feature_id is None:
+                    total += (_feature_weight(feature) * self._unseen_idf) ** 2
+                    continue
+                weight = self._scale[feature_id]
+                total += weight * weight
+                known.append((self._df[feature_id], feature_id, weight))
+            known.sort()
+            for rank, (df, feature_id, weight) in enumerate(known):
+                queries.append(query)
+                features.append(feature_id)
+                weights.append(weight)
+                walk.append(rank < RAREST_WALKED or df <= self._max_df)
+            norms[query] = math.sqrt(total) or 1.0
+        query_ids = np.asarray(queries, dtype=np.int64)
+        return (
+            query_ids,
+            np.asarray(features, dtype=np.int64),
+            np.asarray(weights) / norms[query_ids],
+            np.asarray(walk, dtype=bool),
+        )
+
+    def _candidates(
+        self, query_ids: np.ndarray, feature_ids: np.ndarray, query_weights: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # The CANDIDATES best (query, item) pairs per query by the walked
+        # features' share of the score
+        starts = self._indptr[feature_ids]
+        lengths = self._indptr[feature_ids + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        postings = np.arange(total, dtype=np.int64) + offsets
+        keys = np.repeat(query_ids, lengths) * len(self.names) + self._items[postings]
+        products = np.repeat(query_weights, lengths) * self._weights[postings]
+
+        order = np.argsort(keys)
+        keys, products = keys[order], products[order]
+        first = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        keys, partial = keys[first], np.add.reduceat(products, first)
+        queries, items = np.divmod(keys, len(self.names))
+        order = np.lexsort((-partial, queries))
+        queries, items = queries[order], items[order]
+        keep = np.arange(len(queries)) - np.searchsorted(queries, queries) < CANDIDATES
+        return queries[keep], items[keep]
+
+    def _scores(self, names: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Exact scores of each name's candidates, sorted by query and then
+        # by descending score
+        query_ids, feature_ids, query_weights, walk = self._query(names)
+        queries, items = self._candidates(query_ids[walk], feature_ids[walk], query_weights[walk])
+
+        # Every (candidate, query feature) combination, looked up by key
+        per_query = np.bincount(query_ids, minlength=len(names))
+        first_feature = np.cumsum(per_query) - per_query
+        lengths = per_query[queries]
+        total = int(lengths.sum())
+        pairs = np.repeat(np.arange(len(queries)), lengths)
+        entries = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(first_feature[queries], lengths)
+        keys = items[pairs] * len(self._ids) + feature_ids[entries]
+        found = np.minimum(np.searchsorted(self._item_keys, keys), len(self._item_keys) - 1)
+        products = np.where(self._item_keys[found] == keys, query_weights[entries] * self._item_weights[found], 0.0)
+        scores = np.bincount(pairs, weights=products, minlength=len(queries))
+
+        order = np.lexsort((items, -scores, queries))
+        return queries[order], items[order], scores[order]
+
+    def search(self, name: str, *, top: int = 5) -> list[tuple[int, float]]:
+        # Best catalog items for one name: (index, score), best first
+        _, items, scores = self._scores([name])
+        return [(int(item), float(score)) for item, score in zip(items[:top], scores[:top])]
+
+    def match(
+        self, names: Sequence[str], *, top: int = 1, min_score: float = DEFAULT_MIN_SCORE
+    ) -> list[NameMatch]:
+        # The `top` best catalog items per name scoring at least min_score,
+        # grouped by name in input order
+        matches: list[NameMatch] = []
+        for block_start in range(0, len(names), QUERY_BLOCK):
+            queries, items, scores = self._scores(names[block_start : block_start + QUERY_BLOCK])
+            rank = np.arange(len(queries)) - np.searchsorted(queries, queries)
+            keep = (rank < top) & (scores >= min_score)
+            matches.extend(
+                NameMatch(query + block_start, item, score)
+                for query, item, score in zip(
+                    queries[keep].tolist(), items[keep].tolist(), np.minimum(scores[keep], 1.0).tolist()
+                )
+            )
+        return matches
+
+
+def match_names(
+    super_one_names: Sequence[str],
+    competitor_names: Sequence[str],
+    *,
+    top: int = 1,
+    min_score: float = DEFAULT_MIN_SCORE,
+    max_df: float = DEFAULT_MAX_DF,
+) -> list[NameMatch]:
+    return NameIndex(competitor_names, max_df=max_df).match(super_one_names, top=top, min_score=min_score)
+
+
+def pair_names(matches: Iterable[NameMatch]) -> list[NameMatch]:
+    # One-to-one pairs from candidate matches: best score first, each name
+    # on either side used once
+    pairs: list[NameMatch] = []
+    used_super_one: set[int] = set()
+    used_competitor: set[int] = set()
+    for match in sorted(matches, key=lambda match: (-match.score, match.super_one, match.competitor)):
+        if match.super_one in used_super_one or match.competitor in used_competitor:
+            continue
+        used_super_one.add(match.super_one)
+        used_competitor.add(match.competitor)
+        pairs.append(match)
+    return sorted(pairs)
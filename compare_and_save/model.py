@@ -0,0 +1,64 @@
+# Domain model and price formatting shared by the app and the renderers
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+import re
+
+COMPETITORS = ("Winco", "Safeway/Albertsons")
+# Folder of competitor price feeds (feeds.FeedWatcher) the app watches
+FEEDS_DIR_ENV = "COMPARE_AND_SAVE_FEEDS"
+
+
+@dataclass(frozen=True)
+class ProductRow:
+    name: str
+    super_one_price: float
+    competitor_price: float
+    carries: str  # "Yes" | "DNC"
+
+
+@dataclass(frozen=True)
+class PriceCheck:
+    # One product's weekly check across competitors: the Super 1 price plus a
+    # (competitor, price, carries) entry per competitor checked.
+    name: str
+    super_one_price: float
+    competitor_prices: tuple[tuple[str, float, str], ...] = ()
+
+    def row_for(self, competitor: str) -> ProductRow:
+        for name, price, carries in self.competitor_prices:
+            if name == competitor:
+                return ProductRow(self.name, self.super_one_price, price, carries)
+        # Not checked at this competitor
+        return ProductRow(self.name, self.super_one_price, 0.0, "DNC")
+
+
+def money(amount: float) -> str:
+    return f"${amount:,.2f}"
+
+
+def to_cents(amount: float) -> int:
+    # Prices are entered to the cent; rounding absorbs the binary float error
+    return round(amount * 100)
+
+
+@lru_cache(maxsize=8192)
+def money_cents(cents: int) -> str:
+    # cents / 100 is the double nearest the exact amount, so two decimals
+    # always print the exact cents. Cached: a deck repeats a few thousand
+    # distinct amounts at most, and int keys don't fragment like floats.
+    return f"${cents / 100:,.2f}"
+
+
+def format_check_date(check_date: date) -> str:
+    # Cross-platform month/day without leading zeros (Excel-style)
+    if hasattr(check_date, "strftime"):
+        return check_date.strftime("%m/%d/%Y").lstrip("0").replace("/0", "/")
+    return str(check_date)
+
+
+def competitor_slug(competitor: str) -> str:
+    # File-name friendly: "Safeway/Albertsons" -> "safeway-albertsons"
+    return re.sub(r"[^a-z0-9]+", "-", competitor.lower()).strip("-")
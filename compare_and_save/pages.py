@@ -0,0 +1,239 @@
+# Print page assembly.
+#
+# Everything here yields HTML chunks in document order instead of building
+# one big string, so the caller decides where they go: "".join() for an
+# in-memory document, fp.writelines() for a file, or a streamed response.
+# Together with DeckSpool, writing a deck to disk holds one page of cards
+# at a time, however long the deck is.
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import hashlib
+from itertools import islice
+import pickle
+import tempfile
+from typing import IO, Iterable, Iterator, Mapping, Sequence
+
+from .arcs import DEFAULT_ARC_MODE, arc_defs_html
+from .cache import LRUCache, shared_cache
+from .cards import SharedSlots, cached_card_html
+from .model import PriceCheck, ProductRow
+from .pricing import is_dnc
+from .styles import card_css
+
+CARDS_PER_PAGE = 4
+DOCUMENT_CACHE_SIZE = 32
+DOCUMENT_CACHE_MB = 256
+SPOOL_CHUNK = 1024
+
+# Encoded print documents by content hash, (digest, document bytes). A
+# 50,000-card document is over 100 MB, hence the budget.
+document_cache: LRUCache[tuple[str, bytes]] = shared_cache(
+    "documents", DOCUMENT_CACHE_SIZE, maxbytes_mb=DOCUMENT_CACHE_MB, sizeof=lambda document: len(document[1])
+)
+
+PRINT_DOC_HEAD = (
+    "<!doctype html><html><head><meta charset='utf-8'>"
+    "<meta name='viewport' content='width=device-width, initial-scale=1'>"
+    "<title>Compare and Save - Print</title>"
+)
+
+
+def deck_rows(products: Iterable[ProductRow]) -> list[ProductRow]:
+    # Cards with a savings amount first, then the "does not carry" cards
+    products = list(products)
+    valid = [r for r in products if not is_dnc(r) and r.super_one_price > 0]
+    dnc = [r for r in products if is_dnc(r)]
+    return valid + dnc
+
+
+class DeckSpool:
+    # deck_rows for every competitor without holding the decks in memory.
+    # One pass over the price checks sorts each competitor's rows into two
+    # temporary files (cards with savings, then DNC cards), SPOOL_CHUNK rows
+    # per pickle; rows() replays them in print order, once per output
+    # format. One replay per competitor at a time.
+    def __init__(self, checks: Iterable[PriceCheck], competitors: Sequence[str]) -> None:
+        self._files = {competitor: (tempfile.TemporaryFile(), tempfile.TemporaryFile()) for competitor in competitors}
+        self.counts = dict.fromkeys(competitors, 0)
+        pending: dict[IO[bytes], list[tuple[str, float, float, str]]] = {
+            spool: [] for spools in self._files.values() for spool in spools
+        }
+        try:
+            for check in checks:
+                for competitor, (valid, dnc) in self._files.items():
+                    row = check.row_for(competitor)
+                    if is_dnc(row):
+                        spool = dnc
+                    elif row.super_one_price > 0:
+                        spool = valid
+                    else:
+                        continue
+                    chunk = pending[spool]
+                    chunk.append((row.name, row.super_one_price, row.competitor_price, row.carries))
+                    if len(chunk) == SPOOL_CHUNK:
+                        pickle.dump(chunk, spool, pickle.HIGHEST_PROTOCOL)
+                        chunk.clear()
+                    self.counts[competitor] += 1
+            for spool, chunk in pending.items():
+                if chunk:
+                    pickle.dump(chunk, spool, pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            self.close()
+            raise
+
+    def rows(self, competitor: str) -> Iterator[ProductRow]:
+        for spool in self._files[competitor]:
+            spool.seek(0)
+            while True:
+                try:
+                    chunk = pickle.load(spool)
+                except EOFError:
+                    break
+                for fields in chunk:
+                    yield ProductRow(*fields)
+
+    def close(self) -> None:
+        for spools in self._files.values():
+            for spool in spools:
+                spool.close()
+
+    def __enter__(self) -> DeckSpool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def deck_rows_by_competitor(checks: Sequence[PriceCheck], competitors: Iterable[str]) -> dict[str, list[ProductRow]]:
+    return {competitor: deck_rows(check.row_for(competitor) for check in checks) for competitor in competitors}
+
+
+def iter_deck_cards(
+    rows: Iterable[ProductRow],
+    *,
+    competitor: str,
+    check_date: date,
+    start: int = 0,
+    stop: int | None = None,
+    arc: str = DEFAULT_ARC_MODE,
+    shared: SharedSlots | None = None,
+) -> Iterator[str]:
+    # Cards start..stop of the deck. With the inline arc, rows before
+    # `start` are counted so a repeated product keeps the same card id in
+    # any window; that count is the only state that grows with the deck.
+    count = arc == "inline"
+    seen: Counter[ProductRow] = Counter()
+    for index, row in enumerate(rows):
+        if stop is not None and index >= stop:
+            break
+        if index >= start:
+            yield cached_card_html(
+                competitor=competitor,
+                check_date=check_date,
+                row=row,
+                occurrence=seen[row],
+                arc=arc,
+                shared=shared,
+            )
+        if count:
+            seen[row] += 1
+
+
+def iter_pages_html(
+    cards: Iterable[str], *, cards_per_page: int = CARDS_PER_PAGE, arc: str = DEFAULT_ARC_MODE
+) -> Iterator[str]:
+    # `arc` must match the mode the cards were rendered with: shared and
+    # outlined cards point at the definitions emitted here.
+    cards = iter(cards)
+    yield '<div class="cs-pages">'
+    yield arc_defs_html(arc)
+    # One page of lookahead: the last page needs the "is-last" class
+    page = list(islice(cards, cards_per_page))
+    while page:
+        next_page = list(islice(cards, cards_per_page))
+        yield '<div class="cs-page is-last">' if not next_page else '<div class="cs-page">'
+        yield from page
+        yield "</div>"
+        page = next_page
+    yield "</div>"
+
+
+def iter_print_document(pages: Iterable[str]) -> Iterator[str]:
+    yield PRINT_DOC_HEAD
+    yield card_css()
+    yield "</head><body style='margin:0; overflow:auto;'>"
+    yield "<div id='print-area'>"
+    yield from pages
+    yield "</div>"
+    yield "</body></html>"
+
+
+def print_document(pages_html: str) -> tuple[str, bytes]:
+    # The standalone print document for one deck and its content hash. A
+    # rerun with an unchanged deck gets the same bytes back without
+    # rebuilding them.
+    digest = hashlib.blake2b(pages_html.encode(), digest_size=16).hexdigest()
+    return document_cache.get_or_create(
+        digest, lambda: (digest, "".join(iter_print_document([pages_html])).encode())
+    )
+
+
+def render_pages_html(
+    rows: Iterable[ProductRow],
+    *,
+    competitor: str,
+    check_date: date,
+    arc: str = DEFAULT_ARC_MODE,
+    shared: SharedSlots | None = None,
+) -> str:
+    cards = iter_deck_cards(rows, competitor=competitor, check_date=check_date, arc=arc, shared=shared)
+    return "".join(iter_pages_html(cards, arc=arc))
+
+
+def render_page_window(
+    rows: Iterable[ProductRow],
+    *,
+    competitor: str,
+    check_date: date,
+    first_page: int,
+    num_pages: int,
+    cards_per_page: int = CARDS_PER_PAGE,
+    arc: str = DEFAULT_ARC_MODE,
+) -> str:
+    # Pages first_page..first_page + num_pages - 1 (0-based) of a deck, for
+    # on-screen preview without rendering the rest of it
+    cards = iter_deck_cards(
+        rows,
+        competitor=competitor,
+        check_date=check_date,
+        start=first_page * cards_per_page,
+        stop=(first_page + num_pages) * cards_per_page,
+        arc=arc,
+    )
+    return "".join(iter_pages_html(cards, cards_per_page=cards_per_page, arc=arc))
+
+
+def render_decks_html(
+    decks: Mapping[str, Sequence[ProductRow]], *, check_date: date, arc: str = DEFAULT_ARC_MODE
+) -> dict[str, str]:
+    # Pages HTML for each competitor's deck (deck_rows_by_competitor),
+    # rendered concurrently. A product's escaped name and Super 1 price are
+    # formatted by the first deck that renders its card and reused by the
+    # others (cards.product_slots).
+    shared: SharedSlots = {}
+    if len(decks) <= 1:
+        return {
+            competitor: render_pages_html(rows, competitor=competitor, check_date=check_date, arc=arc, shared=shared)
+            for competitor, rows in decks.items()
+        }
+    with ThreadPoolExecutor(max_workers=len(decks)) as pool:
+        futures = {
+            competitor: pool.submit(
+                render_pages_html, rows, competitor=competitor, check_date=check_date, arc=arc, shared=shared
+            )
+            for competitor, rows in decks.items()
+        }
+        return {competitor: future.result() for competitor, future in futures.items()}
@@ -0,0 +1,390 @@
+# Server-side PDF export of card decks.
+#
+# A small dependency-free PDF writer that lays out the same 2x2 letter
+# landscape grid as .cs-page/.cs-card in CARD_CSS. It only uses the standard
+# 14 PDF fonts, so nothing is embedded and no browser is needed: Cooper Black
+# falls back to Times-Bold, Caveat to Helvetica-BoldOblique and Arial to
+# Helvetica, matching the CSS fallbacks as closely as the base fonts allow.
+#
+# Pages are written as they are laid out, so write_deck_pdf() can stream a
+# deck of any size to a file.
+from __future__ import annotations
+
+from datetime import date
+import io
+from itertools import islice
+import math
+from typing import BinaryIO, Callable, Iterable
+import zlib
+
+from .model import ProductRow, format_check_date, money, money_cents
+from .pages import CARDS_PER_PAGE
+from .pricing import is_dnc, savings_cents
+
+PT_PER_IN = 72.0
+PT_PER_PX = 0.75
+
+PAGE_W = 11 * PT_PER_IN
+PAGE_H = 8.5 * PT_PER_IN
+PAGE_MARGIN = 0.35 * PT_PER_IN
+GRID_GAP = 0.25 * PT_PER_IN
+CARD_W = (PAGE_W - 2 * PAGE_MARGIN - GRID_GAP) / 2
+CARD_H = 3.75 * PT_PER_IN
+
+CARD_BORDER = 3 * PT_PER_PX
+CARD_PAD_X = 0.2 * PT_PER_IN
+CARD_PAD_Y = 0.18 * PT_PER_IN
+BODY_GAP = 0.12 * PT_PER_IN
+DIVIDER_W = 0.08 * PT_PER_IN
+COLUMN_PAD = 0.06 * PT_PER_IN
+
+# Standard 14 font widths (1/1000 em) for printable ASCII, from the Adobe AFMs
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+_TIMES_BOLD = (
+    250, 333, 555, 500, 500, 1000, 833, 278, 333, 333, 500, 570, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+    930, 722, 667, 722, 722, 667, 611, 778, 778, 389, 500, 778, 667, 944, 722, 778,
+    611, 778, 722, 556, 667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500,
+    333, 500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833, 556, 500,
+    556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444, 394, 220, 394, 520,
+)
+
+# resource name -> (base font, widths)
+FONTS = {
+    "F1": ("Helvetica-Bold", _HELVETICA_BOLD),
+    "F2": ("Helvetica", _HELVETICA),
+    "F3": ("Helvetica-BoldOblique", _HELVETICA_BOLD),
+    "F4": ("Times-Bold", _TIMES_BOLD),
+}
+ARIAL_BOLD = "F1"
+ARIAL = "F2"
+CAVEAT = "F3"
+COOPER_BLACK = "F4"
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    widths = FONTS[font][1]
+    units = 0
+    for ch in text:
+        code = ord(ch)
+        units += widths[code - 32] if 32 <= code < 127 else widths[16]
+    return units * size / 1000
+
+
+def _pdf_string(text: str) -> str:
+    # WinAnsi bytes carried in a latin-1 str; the stream is encoded at the end
+    raw = text.encode("cp1252", errors="replace").decode("latin-1")
+    return "(" + raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _n(value: float) -> str:
+    return f"{value:.2f}"
+
+
+class _Canvas:
+    # Collects content-stream operators for one page (y axis points up)
+
+    def __init__(self) -> None:
+        self.ops: list[str] = []
+
+    def stroke_rect(self, x: float, y: float, w: float, h: float, line_width: float) -> None:
+        self.ops.append(f"{_n(line_width)} w {_n(x)} {_n(y)} {_n(w)} {_n(h)} re S")
+
+    def fill_rect(self, x: float, y: float, w: float, h: float) -> None:
+        self.ops.append(f"{_n(x)} {_n(y)} {_n(w)} {_n(h)} re f")
+
+    def text(self, x: float, y: float, text: str, font: str, size: float, *, char_spacing: float = 0.0) -> None:
+        # Tc is text state and outlives ET, so reset it after use
+        tc, reset = (f"{_n(char_spacing)} Tc ", " 0 Tc") if char_spacing else ("", "")
+        self.ops.append(f"BT /{font} {_n(size)} Tf {tc}{_n(x)} {_n(y)} Td {_pdf_string(text)} Tj{reset} ET")
+
+    def rotated_text(self, x: float, y: float, dx: float, dy: float, text: str, font: str, size: float) -> None:
+        # Baseline runs along the unit vector (dx, dy)
+        self.ops.append(
+            f"BT /{font} {_n(size)} Tf {dx:.4f} {dy:.4f} {-dy:.4f} {dx:.4f} {_n(x)} {_n(y)} Tm {_pdf_string(text)} Tj ET"
+        )
+
+
+def _fit_size(text: str, font: str, size: float, max_width: float) -> float:
+    # Shrink (never grow) so long names and prices stay inside their column
+    width = text_width(text, font, size)
+    return size if width <= max_width else size * max_width / width
+
+
+def _centered(canvas: _Canvas, cx: float, y: float, text: str, font: str, size: float, max_width: float) -> None:
+    size = _fit_size(text, font, size, max_width)
+    canvas.text(cx - text_width(text, font, size) / 2, y, text, font, size)
+
+
+def _draw_label(canvas: _Canvas, x: float, y: float, text: str, size: float, *, center: bool, max_width: float) -> None:
+    # Caveat label with its underline (text-underline-offset: 5px)
+    size = _fit_size(text, CAVEAT, size, max_width)
+    width = text_width(text, CAVEAT, size)
+    left = x - width / 2 if center else x
+    canvas.text(left, y, text, CAVEAT, size)
+    canvas.fill_rect(left, y - 5 * PT_PER_PX, width, size / 14)
+
+
+def _draw_arc_text(
+    canvas: _Canvas,
+    text: str,
+    *,
+    to_page: Callable[[float, float], tuple[float, float]],
+    scale: float,
+    cx: float,
+    cy: float,
+    r: float,
+    size: float,
+    letter_spacing: float,
+) -> None:
+    # Same geometry as the SVG: an upper semicircle from (cx - r, cy) to
+    # (cx + r, cy) in viewBox units, text centered at 50% of its length.
+    advances = [text_width(ch, ARIAL_BOLD, size) + letter_spacing for ch in text]
+    offset = math.pi * r / 2 - sum(advances) / 2
+    for ch, advance in zip(text, advances):
+        glyph_w = advance - letter_spacing
+        mid = offset + glyph_w / 2
+        theta = mid / r
+        # Point and tangent on the arc, SVG coordinates (y down)
+        px, py = cx - r * math.cos(theta), cy - r * math.sin(theta)
+        tx, ty = math.sin(theta), -math.cos(theta)
+        x, y = to_page(px - tx * glyph_w / 2, py - ty * glyph_w / 2)
+        canvas.rotated_text(x, y, tx, -ty, ch, ARIAL_BOLD, size * scale)
+        offset += advance
+
+
+def draw_card(canvas: _Canvas, x: float, top: float, *, competitor: str, date_str: str, row: ProductRow) -> None:
+    dnc = is_dnc(row)
+    competitor_price = 0.0 if dnc else float(row.competitor_price)
+    super_one_price = float(row.super_one_price)
+
+    canvas.stroke_rect(
+        x + CARD_BORDER / 2, top - CARD_H + CARD_BORDER / 2, CARD_W - CARD_BORDER, CARD_H - CARD_BORDER, CARD_BORDER
+    )
+    inner_x = x + CARD_BORDER + CARD_PAD_X
+    inner_w = CARD_W - 2 * (CARD_BORDER + CARD_PAD_X)
+    inner_top = top - CARD_BORDER - CARD_PAD_Y
+    inner_bottom = top - CARD_H + CARD_BORDER + CARD_PAD_Y
+    center_x = inner_x + inner_w / 2
+
+    # Header: "Compare AND Save" + product name
+    title_size, and_size, and_margin = 44 * PT_PER_PX, 26 * PT_PER_PX, 10 * PT_PER_PX
+    compare_w = text_width("Compare", COOPER_BLACK, title_size)
+    and_w = text_width("AND", COOPER_BLACK, and_size)
+    save_w = text_width("Save", COOPER_BLACK, title_size)
+    title_x = center_x - (compare_w + and_w + save_w + 2 * and_margin) / 2
+    title_baseline = inner_top - title_size * 0.8
+    canvas.text(title_x, title_baseline, "Compare", COOPER_BLACK, title_size)
+    and_x = title_x + compare_w + and_margin
+    and_baseline = title_baseline + 8 * PT_PER_PX
+    canvas.text(and_x, and_baseline, "AND", COOPER_BLACK, and_size)
+    canvas.fill_rect(and_x, and_baseline - and_size * 0.22 - 6 * PT_PER_PX, and_w, 4 * PT_PER_PX)
+    canvas.text(and_x + and_w + and_margin, title_baseline, "Save", COOPER_BLACK, title_size)
+
+    product_size = 20 * PT_PER_PX
+    product_top = inner_top - title_size - 0.04 * PT_PER_IN - 2 * PT_PER_PX
+    _centered(canvas, center_x, product_top - product_size * 0.9, row.name, ARIAL_BOLD, product_size, inner_w)
+
+    # Body: left prices | divider | right savings, as grid 1fr 0.08in 1.2fr
+    body_top = product_top - product_size * 1.15 - 0.06 * PT_PER_IN
+    body_h = body_top - inner_bottom
+    left_w = (inner_w - DIVIDER_W - 2 * BODY_GAP) / 2.2
+    divider_x = inner_x + left_w + BODY_GAP
+    right_x = divider_x + DIVIDER_W + BODY_GAP
+    right_w = inner_x + inner_w - right_x
+    canvas.fill_rect(divider_x, inner_bottom, DIVIDER_W, body_h)
+
+    label_size, price_size = 28 * PT_PER_PX, 44 * PT_PER_PX
+    label_line, price_line = label_size * 1.2, price_size * 1.15
+    price_gap = 4 * PT_PER_PX
+    left_inner_w = left_w - COLUMN_PAD
+    body_mid = inner_bottom + body_h / 2
+
+    if dnc:
+        block_h = label_line + price_gap + price_line
+        block_top = body_mid + block_h / 2
+        left_cx = inner_x + left_inner_w / 2
+        _draw_label(canvas, left_cx, block_top - label_size, "Super 1 Price", label_size, center=True, max_width=left_inner_w)
+        _centered(
+            canvas, left_cx, block_top - label_line - price_gap - price_size * 0.85, money(super_one_price),
+            ARIAL_BOLD, price_size, left_inner_w,
+        )
+    else:
+        if competitor.lower().startswith("safeway"):
+            label_lines = ["Safeway/Albertsons", "Price"]
+            label_h = 2 * label_size * 1.05
+        else:
+            label_lines = [f"{competitor} Price"]
+            label_h = label_line
+        block_gap = 0.14 * PT_PER_IN
+        stack_h = label_h + label_line + 2 * (price_gap + price_line) + block_gap
+        y = body_mid + stack_h / 2
+
+        if len(label_lines) == 1:
+            _draw_label(canvas, inner_x, y - label_size, label_lines[0], label_size, center=False, max_width=left_inner_w)
+        else:
+            line1_size = _fit_size(label_lines[0], CAVEAT, label_size, left_inner_w)
+            _draw_label(canvas, inner_x, y - label_size, label_lines[0], line1_size, center=False, max_width=left_inner_w)
+            line1_w = text_width(label_lines[0], CAVEAT, line1_size)
+            _draw_label(
+                canvas, inner_x + line1_w / 2, y - label_size * 2.05, label_lines[1], label_size,
+                center=True, max_width=left_inner_w,
+            )
+        y -= label_h + price_gap
+        price = money(competitor_price)
+        canvas.text(inner_x, y - price_size * 0.85, price, ARIAL_BOLD, _fit_size(price, ARIAL_BOLD, price_size, left_inner_w))
+        y -= price_line + block_gap
+
+        _draw_label(canvas, inner_x, y - label_size, "Super 1 Price", label_size, center=False, max_width=left_inner_w)
+        y -= label_line + price_gap
+        price = money(super_one_price)
+        canvas.text(inner_x, y - price_size * 0.85, price, ARIAL_BOLD, _fit_size(price, ARIAL_BOLD, price_size, left_inner_w))
+
+    # Right column content starts after its padding-left
+    col_x = right_x + COLUMN_PAD
+    col_w = right_w - COLUMN_PAD
+    col_cx = col_x + col_w / 2
+    date_size = 14 * PT_PER_PX
+
+    def date_row(baseline: float) -> None:
+        canvas.text(col_x, baseline, "Price Check Date:", ARIAL, date_size)
+        canvas.text(col_x + col_w - text_width(date_str, ARIAL, date_size), baseline, date_str, ARIAL, date_size)
+
+    if dnc:
+        date_baseline = inner_bottom + 2 * PT_PER_PX + date_size * 0.25
+        date_row(date_baseline)
+        line1_size, line2_size = 24 * PT_PER_PX, 22 * PT_PER_PX
+        msg_h = line1_size * 1.1 + 2 * PT_PER_PX + line2_size * 1.1
+        area_mid = (body_top + date_baseline + date_size) / 2
+        msg_top = area_mid + msg_h / 2
+        _centered(canvas, col_cx, msg_top - line1_size * 0.9, competitor, ARIAL_BOLD, line1_size, col_w)
+        spacing = 1 * PT_PER_PX
+        line2 = "DOES NOT CARRY"
+        line2_w = text_width(line2, ARIAL_BOLD, line2_size) + spacing * len(line2)
+        canvas.text(
+            col_cx - line2_w / 2, msg_top - line1_size * 1.1 - 2 * PT_PER_PX - line2_size * 0.9, line2,
+            ARIAL_BOLD, line2_size, char_spacing=spacing,
+        )
+        return
+
+    # Normal: arc (230x150px box, viewBox 0 0 250 170, meet), savings, date
+    arc_w, arc_h = 230 * PT_PER_PX, 150 * PT_PER_PX
+    savings_size = 64 * PT_PER_PX
+    date_gap = 8 * PT_PER_PX
+    stack_h = arc_h + savings_size + date_gap + date_size * 1.15
+    arc_top = body_mid + stack_h / 2
+    scale = min(arc_w / 250, arc_h / 170)
+    arc_x = col_cx - 250 * scale / 2
+
+    def to_page(vx: float, vy: float) -> tuple[float, float]:
+        return arc_x + vx * scale, arc_top - vy * scale
+
+    _draw_arc_text(canvas, "BUYING POWER", to_page=to_page, scale=scale, cx=125, cy=130, r=110, size=18, letter_spacing=4)
+    _draw_arc_text(canvas, "SAVINGS", to_page=to_page, scale=scale, cx=125, cy=145, r=95, size=22, letter_spacing=5)
+
+    savings_top = arc_top - arc_h
+    _centered(
+        canvas, col_cx, savings_top - savings_size * 0.8, money_cents(savings_cents(row)),
+        ARIAL_BOLD, savings_size, col_w,
+    )
+    date_row(savings_top - savings_size - date_gap - date_size * 0.9)
+
+
+def page_content(rows: list[ProductRow], *, competitor: str, date_str: str) -> bytes:
+    canvas = _Canvas()
+    canvas.ops.append("0 g 0 G")
+    for index, row in enumerate(rows):
+        col, line = index % 2, index // 2
+        x = PAGE_MARGIN + col * (CARD_W + GRID_GAP)
+        top = PAGE_H - PAGE_MARGIN - line * (CARD_H + GRID_GAP)
+        draw_card(canvas, x, top, competitor=competitor, date_str=date_str, row=row)
+    return "\n".join(canvas.ops).encode("latin-1")
+
+
+class _PdfWriter:
+    def __init__(self, fp: BinaryIO) -> None:
+        self._fp = fp
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._next = 1
+
+    def reserve(self) -> int:
+        num = self._next
+        self._next += 1
+        return num
+
+    def write(self, data: bytes) -> None:
+        self._fp.write(data)
+        self._pos += len(data)
+
+    def object(self, num: int, body: bytes) -> None:
+        self._offsets[num] = self._pos
+        self.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+    def stream(self, num: int, data: bytes) -> None:
+        packed = zlib.compress(data, 6)
+        self.object(num, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(packed) + packed + b"\nendstream")
+
+    def finish(self, root: int, info: int) -> None:
+        xref_pos = self._pos
+        lines = [b"xref\n0 %d\n" % self._next, b"0000000000 65535 f \n"]
+        lines.extend(b"%010d 00000 n \n" % self._offsets[num] for num in range(1, self._next))
+        lines.append(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next, root, info, xref_pos))
+        self.write(b"".join(lines))
+
+
+def write_deck_pdf(fp: BinaryIO, rows: Iterable[ProductRow], *, competitor: str, check_date: date) -> None:
+    # `rows` are cards in print order (see deck_rows); 4 per letter-landscape page
+    writer = _PdfWriter(fp)
+    writer.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    catalog, pages, resources, info = (writer.reserve() for _ in range(4))
+
+    font_refs = []
+    for name, (base_font, _) in FONTS.items():
+        num = writer.reserve()
+        writer.object(num, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base_font.encode())
+        font_refs.append(b"/%s %d 0 R" % (name.encode(), num))
+    writer.object(resources, b"<< /Font << " + b" ".join(font_refs) + b" >> >>")
+
+    date_str = format_check_date(check_date)
+    kids: list[int] = []
+    rows = iter(rows)
+    while page_rows := list(islice(rows, CARDS_PER_PAGE)):
+        content, page = writer.reserve(), writer.reserve()
+        writer.stream(content, page_content(page_rows, competitor=competitor, date_str=date_str))
+        writer.object(
+            page,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %d 0 R /Contents %d 0 R >>"
+            % (pages, PAGE_W, PAGE_H, resources, content),
+        )
+        kids.append(page)
+
+    writer.object(
+        pages,
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % kid for kid in kids) + b"] /Count %d >>" % len(kids),
+    )
+    writer.object(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % pages)
+    title = _pdf_string(f"Compare and Save - {competitor} - {date_str}").encode("latin-1")
+    writer.object(info, b"<< /Title " + title + b" /Producer (compare_and_save) >>")
+    writer.finish(catalog, info)
+
+
+def render_deck_pdf(rows: Iterable[ProductRow], *, competitor: str, check_date: date) -> bytes:
+    buffer = io.BytesIO()
+    write_deck_pdf(buffer, rows, competitor=competitor, check_date=check_date)
+    return buffer.getvalue()
@@ -0,0 +1,96 @@
+# Per-rerun timings and counters for the app's performance panel.
+#
+# A PerfRecorder lives for one script run: phases are timed with
+# `with recorder.phase("validation"):`, payloads are sized as they are handed
+# to Streamlit, and finish() folds in the card cache's hit/miss counters.
+# The counters are process-wide, so with several sessions rerunning at once
+# the card numbers include their work too.
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import os
+import time
+from typing import Iterator, NamedTuple, TypeVar
+
+from .cards import card_cache
+
+PERF_ENV = "COMPARE_AND_SAVE_PERF"
+HISTORY_SIZE = 50
+
+log = logging.getLogger("compare_and_save.perf")
+
+Payload = TypeVar("Payload", str, bytes)
+
+
+def perf_enabled_by_env() -> bool:
+    return os.environ.get(PERF_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# With the env var set every rerun is logged to stderr, panel or not
+if perf_enabled_by_env() and not log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+
+
+class RerunStats(NamedTuple):
+    run: int
+    total_ms: float
+    phases_ms: dict[str, float]
+    payload_bytes: dict[str, int]
+    cards_rendered: int
+    cards_cached: int
+    counts: dict[str, int]
+
+    def summary(self) -> str:
+        phases = " ".join(f"{name}={ms:.1f}ms" for name, ms in self.phases_ms.items())
+        payload = sum(self.payload_bytes.values())
+        return (
+            f"rerun {self.run}: {self.total_ms:.1f}ms [{phases}] cards {self.cards_rendered} rendered / "
+            f"{self.cards_cached} cached, payload {payload / 1024:.1f} KiB"
+        )
+
+
+class PerfRecorder:
+    def __init__(self, run: int = 0) -> None:
+        self.run = run
+        self.phases_ms: dict[str, float] = {}
+        self.payload_bytes: Counter[str] = Counter()
+        self.counts: Counter[str] = Counter()
+        self._cache_start = card_cache.info()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # Re-entering a phase adds to it (e.g. one "cards" phase per deck)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases_ms[name] = self.phases_ms.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def payload(self, name: str, data: Payload) -> Payload:
+        # Returns `data` so it can wrap the argument of st.markdown() etc.
+        self.payload_bytes[name] += len(data) if isinstance(data, bytes) else len(data.encode("utf-8"))
+        return data
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] += n
+
+    def finish(self) -> RerunStats:
+        cache = card_cache.info()
+        stats = RerunStats(
+            run=self.run,
+            total_ms=(time.perf_counter() - self._start) * 1000,
+            phases_ms=dict(self.phases_ms),
+            payload_bytes=dict(self.payload_bytes),
+            cards_rendered=cache.misses - self._cache_start.misses,
+            cards_cached=cache.hits - self._cache_start.hits,
+            counts=dict(self.counts),
+        )
+        if perf_enabled_by_env():
+            log.info(stats.summary())
+        return stats
@@ -0,0 +1,37 @@
+# Pricing rules shared by the renderers, the app's validation and the CLI
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from .batch import BatchRow
+from .model import PriceCheck, ProductRow, to_cents
+
+
+def is_dnc(row: ProductRow) -> bool:
+    # Nothing to compare against: the card says the competitor doesn't carry it
+    return row.carries == "DNC" or row.competitor_price == 0
+
+
+def savings_cents(row: ProductRow | BatchRow) -> int:
+    # In whole cents, so the amount on the card never drifts by a cent
+    if isinstance(row, BatchRow):
+        return abs(row.competitor_cents - row.super_one_cents)
+    return abs(to_cents(row.competitor_price) - to_cents(row.super_one_price))
+
+
+def savings(row: ProductRow) -> float:
+    return savings_cents(row) / 100
+
+
+def is_overpriced(row: ProductRow) -> bool:
+    # Super 1 above a competitor that carries the item defeats the card
+    return row.carries == "Yes" and row.competitor_price > 0 and row.super_one_price > row.competitor_price
+
+
+def price_errors(checks: Sequence[PriceCheck], competitors: Iterable[str]) -> list[tuple[str, ProductRow]]:
+    return [
+        (competitor, row)
+        for competitor in competitors
+        for row in (check.row_for(competitor) for check in checks)
+        if is_overpriced(row)
+    ]
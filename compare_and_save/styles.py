@@ -0,0 +1,290 @@
+# Card and print-page stylesheet shared by every renderer.
+#
+# CARD_CSS is built on first access: inlining the card fonts reads (and may
+# subset) font files, which callers that only write PDFs never need.
+from __future__ import annotations
+
+from functools import lru_cache
+
+CARD_RULES = """
+<style>
+/* font faces */
+
+  /* Layout for the paged print grid (also visible on screen) */
+  .cs-pages { display: block; }
+  .cs-page {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    grid-template-rows: 1fr 1fr;
+    gap: 0.25in;
+    margin-bottom: 0.25in;
+  }
+
+  .cs-card {
+    background: #fff;
+    border: 3px solid #000;
+    padding: 0.18in 0.2in;
+    box-sizing: border-box;
+    break-inside: avoid;
+    page-break-inside: avoid;
+    display: flex;
+    flex-direction: column;
+    min-height: 3.75in;
+  }
+
+  .cs-header {
+    text-align: center;
+    margin-bottom: 0.06in;
+  }
+
+  .cs-title {
+    line-height: 1;
+    margin-bottom: 0.04in;
+  }
+
+  .cs-title-compare,
+  .cs-title-save {
+    font-family: "Cooper Black", "CooperBlack", Georgia, serif;
+    font-size: 44px;
+    font-weight: 800;
+    letter-spacing: 0.5px;
+  }
+
+  .cs-title-and {
+    display: inline-block;
+    margin: 0 10px;
+    font-family: "Cooper Black", "CooperBlack", Georgia, serif;
+    font-weight: 900;
+    font-size: 26px;
+    position: relative;
+    top: -8px;
+  }
+
+  .cs-title-and span {
+    border-bottom: 4px solid #000;
+    padding-bottom: 2px;
+  }
+
+  .cs-product {
+    font-family: Arial, sans-serif;
+    font-size: 20px;
+    font-weight: 700;
+    margin-top: 2px;
+  }
+
+  .cs-body {
+    display: grid;
+    grid-template-columns: 1fr 0.08in 1.2fr;
+    align-items: stretch;
+    gap: 0.12in;
+    flex: 1 1 auto;
+    min-height: 0;
+  }
+
+  .cs-divider {
+    width: 0.08in;
+    background: #000;
+  }
+
+  .cs-left {
+    display: flex;
+    flex-direction: column;
+    justify-content: center;
+    gap: 0.14in;
+    padding-right: 0.06in;
+  }
+
+  .cs-left-dnc {
+    display: flex;
+    align-items: center;
+    justify-content: center;
+  }
+
+  .cs-price-block {
+    text-align: left;
+  }
+
+  .cs-price-block-center {
+    text-align: center;
+  }
+
+  .cs-label-center {
+    text-align: center;
+  }
+
+  .cs-price-center {
+    text-align: center;
+  }
+
+  .cs-label {
+    font-family: "Caveat", cursive;
+    font-size: 28px;
+    font-weight: 700;
+    text-decoration: underline;
+    text-underline-offset: 5px;
+  }
+
+  .cs-label-line1 {
+    display: block;
+    line-height: 1.05;
+  }
+  .cs-label-line2 {
+    display: block;
+    line-height: 1.05;
+    text-align: center;
+  }
+
+  .cs-price {
+    font-family: Arial, sans-serif;
+    font-size: 44px;
+    font-weight: 900;
+    margin-top: 4px;
+  }
+
+  .cs-right {
+    display: flex;
+    flex-direction: column;
+    justify-content: center;
+    align-items: center;
+    padding-left: 0.06in;
+    text-align: center;
+  }
+
+  .cs-right-dnc {
+    display: grid;
+    grid-template-rows: 1fr auto;
+    justify-items: center;
+    align-items: center;
+  }
+
+  .cs-dnc-line1,
+  .cs-dnc-line2 {
+    display: block;
+  }
+
+  .cs-dnc-line1 {
+    font-size: 24px;
+    font-weight: 900;
+    margin-bottom: 2px;
+  }
+
+  .cs-dnc-line2 {
+    font-size: 22px;
+    font-weight: 900;
+    letter-spacing: 1px;
+  }
+
+  /* Shared arc symbol (arcs.arc_defs_html); takes no space */
+  .cs-arc-defs {
+    position: absolute;
+    width: 0;
+    height: 0;
+    overflow: hidden;
+  }
+
+  .cs-arc {
+    width: 230px;
+    height: 150px;
+    margin: 0;
+  }
+
+  .cs-arc-text {
+    font-family: Arial, sans-serif;
+    font-size: 18px;
+    font-weight: 900;
+    letter-spacing: 4px;
+    fill: #000;
+  }
+
+  .cs-arc-text2 {
+    font-size: 22px;
+    letter-spacing: 5px;
+  }
+
+  .cs-savings {
+    font-family: Arial, sans-serif;
+    font-size: 64px;
+    font-weight: 900;
+    line-height: 1;
+  }
+
+  .cs-savings-negative {
+    color: #e00000;
+  }
+
+  .cs-savings-positive {
+    color: #000;
+  }
+
+  .cs-date-row {
+    width: 100%;
+    display: flex;
+    justify-content: space-between;
+    margin-top: 8px;
+    font-family: Arial, sans-serif;
+    font-size: 14px;
+  }
+
+  .cs-dnc-big {
+    font-family: Arial, sans-serif;
+    line-height: 1.1;
+    margin: 0;
+    place-self: center;
+  }
+
+  /* Push date to the bottom for DNC cards */
+  .cs-right-dnc .cs-date-row {
+    margin-top: 0;
+    margin-bottom: 2px;
+    align-self: end;
+  }
+
+  /* Print-only behavior: show ONLY the card grid */
+  @page { size: letter landscape; margin: 0.35in; }
+
+  @media print {
+    html, body { overflow: hidden !important; height: auto !important; }
+    body * { visibility: hidden !important; }
+    #print-area, #print-area * { visibility: visible !important; }
+    #print-area { position: static !important; width: 100% !important; overflow: visible !important; }
+
+    /* One .cs-page = one sheet; keep it within printable height so 4 cards stay on one page */
+    .cs-page {
+      break-after: page;
+      page-break-after: always;
+      break-inside: avoid;
+      page-break-inside: avoid;
+      max-height: 7.8in;
+    }
+    .cs-page.is-last {
+      break-after: auto;
+      page-break-after: auto;
+      max-height: none;
+    }
+    .cs-card {
+      margin: 0;
+      height: 3.75in;
+      overflow: hidden;
+    }
+
+    /* Hide Streamlit chrome that can still show in print */
+    [data-testid="stToolbar"],
+    [data-testid="stDecoration"],
+    footer,
+    [data-testid="stHeader"] { display: none !important; visibility: hidden !important; }
+  }
+</style>
+"""
+
+
+@lru_cache(maxsize=None)
+def card_css() -> str:
+    from .fonts import font_face_css
+
+    return CARD_RULES.replace("/* font faces */", font_face_css(), 1)
+
+
+def __getattr__(name: str) -> str:
+    if name == "CARD_CSS":
+        return card_css()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,292 @@
+# Columnar price table behind the app's editor.
+#
+# The table is the editor's wide layout: Product Name, Super 1 Price and a
+# "<competitor> Price" / "<competitor> Carries?" pair per competitor. The
+# pricing rules (pricing.py) and deck order (pages.deck_rows) are applied
+# here as column operations, so validating and classifying a 50,000-row
+# catalog costs a few pandas passes instead of a ProductRow per cell.
+# Decks leave as ProductBatches (integer cents), and only for the cards
+# actually rendered. Classified decks and preview windows are cached by
+# content, so a rerun that leaves the prices alone renders nothing.
+from __future__ import annotations
+
+from datetime import date
+import hashlib
+import math
+from typing import Iterable, Iterator, Mapping, NamedTuple, Sequence
+
+import pandas as pd
+
+from .arcs import DEFAULT_ARC_MODE
+from .batch import ProductBatch
+from .cache import LRUCache, shared_cache
+from .catalog import normalize_name
+from .cards import cached_card_html
+from .model import COMPETITORS, PriceCheck
+from .pages import CARDS_PER_PAGE
+
+# One deck (competitor) of the table, in card order
+DECK_COLUMNS = ["name", "super_one_price", "competitor_price", "carries"]
+PRINT_DECK_CACHE_SIZE = 16
+PREVIEW_CACHE_SIZE = 256
+PRINT_DECK_CACHE_MB = 128
+PREVIEW_CACHE_MB = 32
+
+
+def price_column(competitor: str) -> str:
+    return f"{competitor} Price"
+
+
+def carries_column(competitor: str) -> str:
+    return f"{competitor} Carries?"
+
+
+PRODUCT_COLUMNS = ["Product Name", "Super 1 Price"] + [
+    column for competitor in COMPETITORS for column in (price_column(competitor), carries_column(competitor))
+]
+
+
+class DeckSummary(NamedTuple):
+    cards: int
+    dnc_cards: int
+    total_savings: float  # over the cards with a savings amount, HOLD UP rows left out
+    average_savings: float
+    max_savings: float
+
+
+class PrintDeck(NamedTuple):
+    key: tuple[str, date, str]  # (competitor, check_date, table_digest)
+    deck: pd.DataFrame
+    summary: DeckSummary
+    pages: int
+
+
+# Shared across reruns and sessions. Decks by PrintDeck.key; preview
+# windows (pages HTML) by the deck key plus the window's first and last page.
+print_deck_cache: LRUCache[PrintDeck] = shared_cache(
+    "print_decks",
+    PRINT_DECK_CACHE_SIZE,
+    maxbytes_mb=PRINT_DECK_CACHE_MB,
+    sizeof=lambda deck: int(deck.deck.memory_usage(index=True, deep=True).sum()),
+)
+preview_cache: LRUCache[str] = shared_cache("previews", PREVIEW_CACHE_SIZE, maxbytes_mb=PREVIEW_CACHE_MB)
+
+
+def empty_price_table(num_rows: int) -> pd.DataFrame:
+    columns = {
+        "Product Name": pd.Series([""] * num_rows, dtype="object"),
+        "Super 1 Price": pd.Series([0.0] * num_rows, dtype="float64"),
+    }
+    for competitor in COMPETITORS:
+        columns[price_column(competitor)] = pd.Series([0.0] * num_rows, dtype="float64")
+        columns[carries_column(competitor)] = pd.Series(["Yes"] * num_rows, dtype="object")
+    return pd.DataFrame(columns, columns=PRODUCT_COLUMNS)
+
+
+def frame_from_checks(checks: Sequence[PriceCheck]) -> pd.DataFrame:
+    columns: dict[str, list] = {
+        "Product Name": [check.name for check in checks],
+        "Super 1 Price": [check.super_one_price for check in checks],
+    }
+    for competitor in COMPETITORS:
+        rows = [check.row_for(competitor) for check in checks]
+        columns[price_column(competitor)] = [row.competitor_price for row in rows]
+        columns[carries_column(competitor)] = [row.carries for row in rows]
+    return pd.DataFrame(columns, columns=PRODUCT_COLUMNS).astype(
+        {"Super 1 Price": "float64", **{price_column(c): "float64" for c in COMPETITORS}}
+    )
+
+
+def clean_price_table(frame: pd.DataFrame) -> pd.DataFrame:
+    # Blank names are placeholder rows, same as the old per-row inputs.
+    # Missing prices count as 0 and a missing Carries? as "Yes".
+    names = frame["Product Name"].fillna("").astype(str).str.strip()
+    keep = (names != "").to_numpy()
+    columns = {
+        "Product Name": names,
+        "Super 1 Price": pd.to_numeric(frame["Super 1 Price"], errors="coerce").fillna(0.0).astype("float64"),
+    }
+    for competitor in COMPETITORS:
+        price, carries = price_column(competitor), carries_column(competitor)
+        columns[price] = pd.to_numeric(frame[price], errors="coerce").fillna(0.0).astype("float64")
+        columns[carries] = frame[carries].fillna("Yes").astype(str)
+    return pd.DataFrame(columns, columns=PRODUCT_COLUMNS)[keep].reset_index(drop=True)
+
+
+def checks_from_frame(frame: pd.DataFrame) -> list[PriceCheck]:
+    table = clean_price_table(frame)
+    per_competitor = [
+        zip([competitor] * len(table), table[price_column(competitor)].tolist(), table[carries_column(competitor)].tolist())
+        for competitor in COMPETITORS
+    ]
+    return [
+        PriceCheck(name=name, super_one_price=super_one_price, competitor_prices=tuple(entries))
+        for name, super_one_price, entries in zip(
+            table["Product Name"].tolist(), table["Super 1 Price"].tolist(), zip(*per_competitor)
+        )
+    ]
+
+
+def apply_competitor_prices(
+    frame: pd.DataFrame, prices: Mapping[tuple[str, str], tuple[float, str]]
+) -> tuple[pd.DataFrame, int]:
+    # Feed prices keyed by (normalize_name(product), competitor), as read by
+    # feeds.read_feed_prices. Only the matching rows whose price or Carries?
+    # differ are rewritten; returns the frame (a copy if anything changed)
+    # and the number of rows changed.
+    by_competitor: dict[str, dict[str, tuple[float, str]]] = {}
+    for (name, competitor), value in prices.items():
+        by_competitor.setdefault(competitor, {})[name] = value
+    if frame.empty or not by_competitor:
+        return frame, 0
+    keys = frame["Product Name"].fillna("").astype(str).map(normalize_name)
+    updated = frame
+    changed = pd.Series(False, index=frame.index)
+    for competitor, entries in by_competitor.items():
+        price, carries = price_column(competitor), carries_column(competitor)
+        if price not in frame:
+            continue
+        new_price = keys.map({name: value[0] for name, value in entries.items()})
+        new_carries = keys.map({name: value[1] for name, value in entries.items()})
+        differs = new_price.notna() & ((frame[price] != new_price) | (frame[carries] != new_carries))
+        if not differs.any():
+            continue
+        if updated is frame:
+            updated = frame.copy()
+        updated.loc[differs, price] = new_price[differs]
+        updated.loc[differs, carries] = new_carries[differs]
+        changed |= differs
+    return updated, int(changed.sum())
+
+
+def _cents(prices: pd.Series) -> pd.Series:
+    # model.to_cents, column-wise
+    return (prices * 100).round().astype("int64")
+
+
+def _dnc_mask(carries: pd.Series, competitor_price: pd.Series) -> pd.Series:
+    # pricing.is_dnc
+    return (carries == "DNC") | (competitor_price == 0)
+
+
+def _overpriced_mask(super_one: pd.Series, carries: pd.Series, competitor_price: pd.Series) -> pd.Series:
+    # pricing.is_overpriced
+    return (carries == "Yes") & (competitor_price > 0) & (super_one > competitor_price)
+
+
+def price_error_table(table: pd.DataFrame, competitors: Iterable[str]) -> pd.DataFrame:
+    # pricing.price_errors: (competitor, product) pairs where Super 1 is higher
+    errors = []
+    for competitor in competitors:
+        price, carries = table[price_column(competitor)], table[carries_column(competitor)]
+        rows = table[_overpriced_mask(table["Super 1 Price"], carries, price)]
+        errors.append(
+            pd.DataFrame(
+                {
+                    "competitor": competitor,
+                    "name": rows["Product Name"],
+                    "super_one_price": rows["Super 1 Price"],
+                    "competitor_price": rows[price_column(competitor)],
+                }
+            )
+        )
+    if not errors:
+        return pd.DataFrame(columns=["competitor", "name", "super_one_price", "competitor_price"])
+    return pd.concat(errors, ignore_index=True)
+
+
+def deck_table(table: pd.DataFrame, competitor: str) -> pd.DataFrame:
+    # pages.deck_rows: cards with a savings amount first, then the "does not
+    # carry" cards, each group in table order
+    deck = pd.DataFrame(
+        {
+            "name": table["Product Name"],
+            "super_one_price": table["Super 1 Price"],
+            "competitor_price": table[price_column(competitor)],
+            "carries": table[carries_column(competitor)],
+        }
+    )
+    deck["dnc"] = _dnc_mask(deck["carries"], deck["competitor_price"])
+    deck["savings_cents"] = (_cents(deck["competitor_price"]) - _cents(deck["super_one_price"])).abs()
+    deck = deck[deck["dnc"] | (deck["super_one_price"] > 0)]
+    deck = deck.sort_values("dnc", kind="stable", ignore_index=True)
+    # The numbering iter_deck_cards gives repeated products, for card ids
+    deck["occurrence"] = deck.groupby(DECK_COLUMNS, sort=False).cumcount()
+    return deck
+
+
+def deck_summary(deck: pd.DataFrame) -> DeckSummary:
+    # A card's amount is the price gap either way; where Super 1 is the
+    # dearer store (a price error) it is not a saving
+    overpriced = _overpriced_mask(deck["super_one_price"], deck["carries"], deck["competitor_price"])
+    savings = deck.loc[~deck["dnc"] & ~overpriced, "savings_cents"]
+    return DeckSummary(
+        cards=len(deck),
+        dnc_cards=int(deck["dnc"].sum()),
+        total_savings=int(savings.sum()) / 100,
+        average_savings=round(float(savings.mean())) / 100 if len(savings) else 0.0,
+        max_savings=int(savings.max()) / 100 if len(savings) else 0.0,
+    )
+
+
+def deck_digest(deck: pd.DataFrame) -> str:
+    # Content hash of a deck's cards, for "has this deck changed?" checks
+    hashes = pd.util.hash_pandas_object(deck[DECK_COLUMNS], index=False)
+    return hashlib.blake2b(hashes.to_numpy().tobytes(), digest_size=16).hexdigest()
+
+
+def table_digest(table: pd.DataFrame) -> str:
+    # Content hash of a whole price table: numeric columns by their bytes,
+    # text columns by their characters plus each value's length. Cheaper
+    # than hash_pandas_object, which spends most of its time on the names.
+    digest = hashlib.blake2b(digest_size=16)
+    for name, column in table.items():
+        digest.update(f"{name}\x1f{len(column)}\x1e".encode())
+        if column.dtype.kind in "biuf":
+            digest.update(column.to_numpy().tobytes())
+        else:
+            values = column.astype(str)
+            digest.update("".join(values.tolist()).encode())
+            digest.update(values.str.len().to_numpy("int64").tobytes())
+    return digest.hexdigest()
+
+
+def print_deck(
+    table: pd.DataFrame, competitor: str, check_date: date, table_key: str | None = None
+) -> tuple[PrintDeck, bool]:
+    # A competitor's deck with its summary and page count, and whether it
+    # came from the cache. Pass table_digest(table) when building several.
+    key = (competitor, check_date, table_key or table_digest(table))
+
+    def build() -> PrintDeck:
+        deck = deck_table(table, competitor)
+        summary = deck_summary(deck)
+        return PrintDeck(key, deck, summary, math.ceil(summary.cards / CARDS_PER_PAGE))
+
+    return print_deck_cache.lookup(key, build)
+
+
+def table_rows(deck: pd.DataFrame, start: int = 0, stop: int | None = None) -> ProductBatch:
+    window = deck.iloc[start:stop]
+    return ProductBatch.from_columns(
+        window["name"].tolist(),
+        _cents(window["super_one_price"]).tolist(),
+        _cents(window["competitor_price"]).tolist(),
+        window["carries"].tolist(),
+    )
+
+
+def iter_table_cards(
+    deck: pd.DataFrame,
+    *,
+    competitor: str,
+    check_date: date,
+    start: int = 0,
+    stop: int | None = None,
+    arc: str = DEFAULT_ARC_MODE,
+) -> Iterator[str]:
+    # iter_deck_cards for a deck table: the occurrence column replaces
+    # counting the rows before `start`
+    occurrences = deck["occurrence"].iloc[start:stop].tolist()
+    for row, occurrence in zip(table_rows(deck, start, stop), occurrences):
+        yield cached_card_html(competitor=competitor, check_date=check_date, row=row, occurrence=occurrence, arc=arc)
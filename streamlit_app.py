@@ -1,603 +1,670 @@
 # Compare and Save - Streamlit Price Comparison App
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
+from contextlib import nullcontext
 from datetime import date, datetime
-import html
-import json
-import uuid
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
 
+import pandas as pd
 import streamlit as st
-import streamlit.components.v1 as components
-
-
-@dataclass(frozen=True)
-class ProductRow:
-    name: str
-    super_one_price: float
-    competitor_price: float
-    carries: str  # "Yes" | "DNC"
-
-
-def money(amount: float) -> str:
-    return f"${amount:,.2f}"
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from compare_and_save import (
+    CARD_CSS,
+    CARDS_PER_PAGE,
+    COMPETITORS,
+    Catalog,
+    PrintDeck,
+    ProductRow,
+    apply_competitor_prices,
+    carries_column,
+    checks_from_frame,
+    clean_price_table,
+    competitor_slug,
+    empty_price_table,
+    frame_from_checks,
+    iter_pages_html,
+    iter_table_cards,
+    money,
+    normalize_name,
+    price_column,
+    preview_cache,
+    price_error_table,
+    print_deck,
+    print_document,
+    render_pages_html,
+    table_digest,
+    table_rows,
+)
+from compare_and_save.arcs import ARC_MODE_ENV, DEFAULT_ARC_MODE, OUTLINED_ARC_UNAVAILABLE, resolve_arc_mode
+from compare_and_save.cache import MIB, shared_caches
+from compare_and_save.model import FEEDS_DIR_ENV
+from compare_and_save.perf import HISTORY_SIZE, PerfRecorder, RerunStats, perf_enabled_by_env
+
+if TYPE_CHECKING:
+    from compare_and_save.feeds import FeedPrices, FeedWatcher
+
+
+DEFAULT_NUM_PRODUCTS = 10
+FEED_CHECK_SECONDS = 2
+PAIRING_MIN_SCORE = 0.3  # weakest proposal listed
+PAIRING_ACCEPT_SCORE = 0.5  # proposals ticked by default
+IMPORT_PREVIEW_ROWS = 20
+MAX_LISTED_ERRORS = 25
+PREVIEW_PAGES = 2
+THUMBNAIL_PAGES = 8
+
+
+@st.cache_resource
+def open_catalog() -> Catalog:
+    # One SQLite connection per server process, shared by every session
+    return Catalog()
+
+
+def catalog_frame(catalog: Catalog, check_date: date) -> pd.DataFrame | None:
+    week = catalog.latest_date(check_date)
+    if week is None:
+        return None
+    return frame_from_checks(catalog.load(week))
+
+
+def load_from_catalog(check_date: date) -> None:
+    frame = catalog_frame(open_catalog(), check_date)
+    if frame is None:
+        st.session_state["catalog_message"] = ("warning", f"The catalog has nothing on or before {check_date:%b %d, %Y}.")
+        return
+    st.session_state["products_frame"] = frame
+    st.session_state.pop("products_editor", None)
+    # The saved week already holds the imported rows it was saved with, so
+    # the upload still in the widget stops adding them to the table
+    upload = st.session_state.get("price_list_upload")
+    if upload is not None:
+        st.session_state["imported_price_list"] = (upload.file_id, empty_price_table(0))
+    st.session_state["catalog_message"] = ("success", f"Loaded **{len(frame):,}** products from the catalog.")
+
+
+def load_price_list_upload(uploaded) -> pd.DataFrame:
+    # Parse each uploaded file once; reruns reuse the table kept in session state
+    if uploaded is None:
+        st.session_state.pop("imported_price_list", None)
+        return empty_price_table(0)
+    cached = st.session_state.get("imported_price_list")
+    if cached is not None and cached[0] == uploaded.file_id:
+        return cached[1]
+    from compare_and_save import PriceListError, read_price_checks
+
+    try:
+        with st.spinner(f"Importing {uploaded.name}…"):
+            imported = frame_from_checks(read_price_checks(uploaded, name=uploaded.name))
+    except (PriceListError, ImportError) as exc:
+        st.error(f"Could not import **{uploaded.name}**: {exc}")
+        return empty_price_table(0)
+    st.session_state["imported_price_list"] = (uploaded.file_id, imported)
+    return imported
+
+
+@st.cache_resource
+def feed_watcher(directory: str) -> FeedWatcher:
+    # One polling thread for the server's feed folder, shared by every
+    # session. The folder comes from the environment, not a widget, so a
+    # session cannot start threads scanning arbitrary server paths.
+    from compare_and_save import FeedWatcher
+
+    return FeedWatcher(directory).start()
+
+
+def apply_price_feed(prices: FeedPrices) -> int:
+    # Re-price the matching rows of the table (applied edits included) and
+    # of the imported price list; other rows and their cards are untouched
+    frame, changed = apply_competitor_prices(
+        st.session_state.get("products_applied", st.session_state["products_frame"]), prices
+    )
+    if changed:
+        st.session_state["products_frame"] = frame
+        st.session_state.pop("products_editor", None)
+    imported = st.session_state.get("imported_price_list")
+    if imported is not None:
+        frame, imported_changed = apply_competitor_prices(imported[1], prices)
+        if imported_changed:
+            st.session_state["imported_price_list"] = (imported[0], frame)
+            changed += imported_changed
+    return changed
+
+
+@st.fragment(run_every=FEED_CHECK_SECONDS)
+def watch_price_feeds(directory: str) -> None:
+    # Reruns on its own every few seconds but only asks the watcher for its
+    # version; the whole app reruns only when a feed re-priced something
+    snapshot = feed_watcher(directory).snapshot()
+    st.caption(f"👀 Watching **{directory}**: {snapshot.files:,} price file(s), {len(snapshot.prices):,} prices.")
+    for name, error in snapshot.errors.items():
+        st.warning(f"Could not read **{name}**: {error}")
+    if "feed_message" in st.session_state:
+        st.info(st.session_state["feed_message"])
+    if snapshot.version == st.session_state.get("feed_version"):
+        return
+    st.session_state["feed_version"] = snapshot.version
+    # Only the prices that are new since this session last applied the feed:
+    # a hand-corrected row stays corrected until a feed reprices it again
+    applied = st.session_state.get("feed_prices", {})
+    st.session_state["feed_prices"] = snapshot.prices
+    changed = apply_price_feed({key: value for key, value in snapshot.prices.items() if applied.get(key) != value})
+    if changed:
+        files = ", ".join(snapshot.changed) or "the watch folder"
+        when = f"{snapshot.updated_at:%H:%M:%S}" if snapshot.updated_at else "now"
+        st.session_state["feed_message"] = f"Re-priced **{changed:,}** product(s) from {files} at {when}."
+        st.rerun()
+
+
+def pairing_proposals(uploaded, competitor: str, names: pd.Series) -> pd.DataFrame | None:
+    # Parse and match a competitor list once per (file, competitor, product
+    # names); reruns reuse the proposals kept in session state
+    key = (uploaded.file_id, competitor, table_digest(names.to_frame()))
+    cached = st.session_state.get("pairing_proposals")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    from compare_and_save import NameIndex, PriceListError, iter_feed_prices, pair_names
+
+    uploaded.seek(0)
+    try:
+        feed = list(iter_feed_prices(uploaded, name=uploaded.name, competitors=[competitor], competitor=competitor))
+    except (PriceListError, ImportError) as exc:
+        st.error(f"Could not read **{uploaded.name}**: {exc}")
+        return None
+    super_one = names.tolist()
+    with st.spinner(f"Matching {len(super_one):,} products against {len(feed):,} {competitor} names…"):
+        candidates = NameIndex([price.name for price in feed]).match(super_one, top=3, min_score=PAIRING_MIN_SCORE)
+        matches = pair_names(candidates)
+    proposals = pd.DataFrame(
+        {
+            "Use": [match.score >= PAIRING_ACCEPT_SCORE for match in matches],
+            "Product Name": [super_one[match.super_one] for match in matches],
+            f"{competitor} name": [feed[match.competitor].name for match in matches],
+            price_column(competitor): [feed[match.competitor].price for match in matches],
+            carries_column(competitor): [feed[match.competitor].carries for match in matches],
+            "Score": [round(match.score, 2) for match in matches],
+        }
+    )
+    st.session_state["pairing_proposals"] = (key, proposals)
+    return proposals
 
 
-def competitor_label_html(competitor: str) -> str:
-    # Excel template breaks Safeway/Albertsons across lines
-    if competitor.lower().startswith("safeway"):
-        return '<span class="cs-label-line1">Safeway/Albertsons</span><span class="cs-label-line2">Price</span>'
-    return f"{competitor} Price"
+def show_name_pairing(competitors: list[str], products_table: pd.DataFrame) -> None:
+    uploaded = st.file_uploader(
+        "Competitor price list",
+        type=["csv", "xlsx", "xlsm"],
+        key="pairing_upload",
+        help="A competitor's own list: product names as they spell them, a Price column and optionally Carries?",
+    )
+    competitor = st.selectbox("Competitor", competitors, key="pairing_competitor")
+    if uploaded is None or competitor is None or products_table.empty:
+        return
+    proposals = pairing_proposals(uploaded, competitor, products_table["Product Name"])
+    if proposals is None:
+        return
+    if proposals.empty:
+        st.warning(f"No {competitor} name looks like any product in the table.")
+        return
+    st.caption(
+        f"{len(proposals):,} proposed pairs, best first within each product. "
+        f"Pairs scoring {PAIRING_ACCEPT_SCORE:.2f} or more are ticked; untick any that are wrong."
+    )
+    chosen = st.data_editor(
+        proposals,
+        key="pairing_editor",
+        hide_index=True,
+        disabled=[column for column in proposals.columns if column != "Use"],
+        column_config={"Score": st.column_config.ProgressColumn("Score", min_value=0.0, max_value=1.0, format="%.2f")},
+    )
+    chosen = chosen[chosen["Use"]]
+    if st.button(f"Use {len(chosen):,} {competitor} price(s)", disabled=chosen.empty, key="pairing_apply"):
+        prices = {
+            (normalize_name(name), competitor): (price, carries)
+            for name, price, carries in zip(
+                chosen["Product Name"], chosen[price_column(competitor)], chosen[carries_column(competitor)]
+            )
+        }
+        changed = apply_price_feed(prices)
+        st.session_state["catalog_message"] = (
+            "success",
+            f"Re-priced **{changed:,}** product(s) from **{uploaded.name}**.",
+        )
+        st.session_state.pop("pairing_editor", None)
+        st.rerun()
+
+
+def keep_pending_edits() -> None:
+    # Switching batch entry moves the editor in/out of a form, which gives it
+    # a new widget identity. Fold the applied edits into the base frame first
+    # so they survive the switch.
+    if "products_applied" in st.session_state:
+        st.session_state["products_frame"] = st.session_state["products_applied"]
+        st.session_state.pop("products_editor", None)
+
+
+def print_document_url(doc: bytes, coordinates: str) -> str | None:
+    # Park the print document in Streamlit's media store (content-addressed,
+    # released with the session) so the page only carries its URL.
+    if not runtime.exists():
+        return None
+    url = runtime.get_instance().media_file_mgr.add(doc, "text/html", coordinates)
+    base_path = st.get_option("server.baseUrlPath").strip("/")
+    return f"/{base_path}{url}" if base_path else url
+
+
+def set_preview_page(key: str, page: int) -> None:
+    st.session_state[key] = page
+
+
+def prepare_print_files(competitor: str, check_date: date, all_items: list[ProductRow]) -> tuple[bytes, bytes]:
+    # The only place a whole deck is rendered: the print view and the PDF
+    from compare_and_save import render_deck_pdf
+
+    pages_html = render_pages_html(all_items, competitor=competitor, check_date=check_date)
+    _, print_doc = print_document(pages_html)
+    return print_doc, render_deck_pdf(all_items, competitor=competitor, check_date=check_date)
+
+
+def show_print_files(competitor: str, check_date: date, deck: PrintDeck) -> str:
+    # Returns the print-button markup that went out with this rerun
+    slug = competitor_slug(competitor)
+    prepared = st.session_state.get(f"print_files_{slug}")
+    if prepared is None or prepared[0] != deck.key:
+        if prepared is not None:
+            st.caption("The product list changed since the print files were made.")
+        if not st.button(
+            "🖨️ Prepare print files",
+            key=f"prepare_{slug}",
+            type="primary",
+            help="Build the print-only view and the PDF for the whole deck",
+        ):
+            return ""
+        with st.spinner(f"Building {deck.summary.cards:,} cards…"), perf.phase("print files"):
+            prepared = (deck.key, *prepare_print_files(competitor, check_date, table_rows(deck.deck)))
+        st.session_state[f"print_files_{slug}"] = prepared
+    _, print_doc, pdf = prepared
+    import json
+
+    import streamlit.components.v1 as components
+
+    # Print button and how-to at the top (needs the media store, so not in bare mode)
+    print_url = print_document_url(print_doc, f"compare_and_save.print.{slug}")
+    print_button_html = "" if print_url is None else f"""
+<div style="margin: 0 0 20px 0;">
+  <button id="openPrint" style="padding:12px 20px;border:none;border-radius:8px;background:#1976d2;color:white;cursor:pointer;font-weight:600;font-size:1em;">
+    Open print-only view
+  </button>
+  <p style="margin:10px 0 0 0;color:#333;font-size:0.95em;">Use <strong>"Open print-only view"</strong> above. Then press <strong>Ctrl+P</strong> (or <strong>Cmd+P</strong>) in that window to print.</p>
+</div>
+<script>
+  document.getElementById("openPrint").addEventListener("click", () => {{
+    const w = window.open({json.dumps(print_url)}, "_blank");
+    if (!w) {{ alert("Please allow pop-ups for this site."); return; }}
+    w.focus();
+  }});
+</script>
+"""
+    if print_button_html:
+        components.html(perf.payload("print button", print_button_html), height=85)
+    st.download_button(
+        "⬇️ Download PDF",
+        data=pdf,
+        file_name=f"compare-and-save-{slug}-{check_date:%Y-%m-%d}.pdf",
+        mime="application/pdf",
+        key=f"pdf_{slug}",
+        help="Print-ready PDF of every card, 4 per letter landscape page. No pop-up window needed.",
+    )
+    return print_button_html
+
+
+def show_deck(competitor: str, check_date: date, products_table: pd.DataFrame, table_key: str) -> None:
+    slug = competitor_slug(competitor)
+    with perf.phase("classification"):
+        deck, deck_cached = print_deck(products_table, competitor, check_date, table_key)
+    print_button_html = show_print_files(competitor, check_date, deck)
+
+    # Summary
+    summary, num_pages = deck.summary, deck.pages
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric(label="Total Cards", value=f"{summary.cards:,}", help=f"{summary.dnc_cards:,} of them 'does not carry'")
+    with col2:
+        st.metric(label="Pages Needed", value=f"{num_pages:,}")
+    with col3:
+        st.metric(label="Total Savings", value=money(summary.total_savings))
+    with col4:
+        st.metric(label="Average Savings", value=money(summary.average_savings))
+    with col5:
+        st.metric(label="Max Savings", value=money(summary.max_savings))
+
+    st.markdown("---")
+    st.markdown("### Printable Cards (4 per page)")
+    if not num_pages:
+        st.info(f"No cards to print for {competitor} yet: enter Super 1 prices in the Input Data tab.")
+        return
+
+    # Only a window of pages is rendered; the rest are reached by navigation
+    page_key = f"preview_page_{slug}"
+    if st.session_state.get(page_key, 1) > num_pages:
+        st.session_state[page_key] = num_pages
+    page = st.session_state.get(page_key, 1)
+
+    prev_col, page_col, next_col, _ = st.columns([1, 2, 1, 4])
+    with prev_col:
+        st.button("◀ Prev", key=f"prev_{slug}", disabled=page <= 1, on_click=set_preview_page, args=(page_key, page - 1))
+    with page_col:
+        page = st.number_input(
+            f"Page (of {num_pages:,})", min_value=1, max_value=num_pages, step=1, key=page_key, label_visibility="collapsed"
+        )
+    with next_col:
+        st.button(
+            "Next ▶", key=f"next_{slug}", disabled=page >= num_pages, on_click=set_preview_page, args=(page_key, page + 1)
+        )
 
+    # Thumbnail strip: the pages around the current one, by product names
+    first_thumb = min(max(1, page - THUMBNAIL_PAGES // 2), max(1, num_pages - THUMBNAIL_PAGES + 1))
+    thumbs = range(first_thumb, min(num_pages, first_thumb + THUMBNAIL_PAGES - 1) + 1)
+    for thumb, thumb_col in zip(thumbs, st.columns(THUMBNAIL_PAGES)):
+        names = deck.deck["name"].iloc[(thumb - 1) * CARDS_PER_PAGE : thumb * CARDS_PER_PAGE].tolist()
+        with thumb_col:
+            st.button(
+                f"Page {thumb}",
+                key=f"thumb_{slug}_{thumb}",
+                type="primary" if thumb == page else "secondary",
+                help="\n\n".join(names) or None,
+                on_click=set_preview_page,
+                args=(page_key, thumb),
+            )
+            st.caption(" · ".join(names))
+
+    def render_preview() -> str:
+        with perf.phase("cards"):
+            cards = list(
+                iter_table_cards(
+                    deck.deck,
+                    competitor=competitor,
+                    check_date=check_date,
+                    start=(page - 1) * CARDS_PER_PAGE,
+                    stop=(page - 1 + PREVIEW_PAGES) * CARDS_PER_PAGE,
+                )
+            )
+        with perf.phase("assembly"):
+            html = f'<div id="print-area">{"".join(iter_pages_html(cards))}</div>'
+        perf.count("preview cards", len(cards))
+        return html
+
+    preview_html, preview_cached = preview_cache.lookup((deck.key, page, PREVIEW_PAGES), render_preview)
+    if deck_cached and preview_cached:
+        perf.count("print cache hits")
+        st.caption("⚡ Print cache hit: this deck and preview were not re-rendered.")
+    st.markdown(perf.payload("preview", preview_html), unsafe_allow_html=True)
+    st.caption(
+        f"Sent with this rerun: {len(preview_html.encode()) / 1024:,.1f} KiB preview + "
+        f"{len(print_button_html.encode()) / 1024:,.1f} KiB print button."
+    )
 
-def render_card_html(
-    *,
-    competitor: str,
-    check_date: date,
-    row: ProductRow,
-) -> str:
-    uid = uuid.uuid4().hex
-    uid2 = uuid.uuid4().hex
-    # Cross-platform month/day without leading zeros (Excel-style)
-    if hasattr(check_date, "strftime"):
-        date_str = check_date.strftime("%m/%d/%Y").lstrip("0").replace("/0", "/")
-    else:
-        date_str = str(check_date)
-
-    is_dnc = row.carries == "DNC" or row.competitor_price == 0
-    competitor_price = 0.0 if is_dnc else float(row.competitor_price)
-    super_one_price = float(row.super_one_price)
-
-    if not is_dnc:
-        savings_amount = abs(competitor_price - super_one_price)
-        savings_text = money(savings_amount)
-
-    # IMPORTANT: keep every line left-aligned. If we indent HTML in Markdown,
-    # Streamlit can interpret it as a code block and show raw tags.
-    left_html_lines: list[str]
-    if is_dnc:
-        # DNC: left side shows ONLY Super 1 Price, centered (no competitor label/price)
-        left_html_lines = [
-            '<div class="cs-left cs-left-dnc">',
-            '<div class="cs-price-block cs-price-block-center">',
-            '<div class="cs-label cs-label-center">Super 1 Price</div>',
-            f'<div class="cs-price cs-price-center">{money(super_one_price)}</div>',
-            "</div>",
-            "</div>",
-        ]
-    else:
-        left_html_lines = [
-            '<div class="cs-left">',
-            '<div class="cs-price-block">',
-            f'<div class="cs-label">{competitor_label_html(competitor)}</div>',
-            f'<div class="cs-price">{money(competitor_price)}</div>',
-            "</div>",
-            "",
-            '<div class="cs-price-block">',
-            '<div class="cs-label">Super 1 Price</div>',
-            f'<div class="cs-price">{money(super_one_price)}</div>',
-            "</div>",
-            "</div>",
-        ]
 
-    right_html_lines: list[str]
-    if is_dnc:
-        # DNC: right side becomes a message, no arc, no savings amount
-        right_html_lines = [
-            '<div class="cs-right cs-right-dnc">',
-            '<div class="cs-dnc-big">',
-            f'<div class="cs-dnc-line1">{html.escape(competitor)}</div>',
-            '<div class="cs-dnc-line2">DOES NOT CARRY</div>',
-            "</div>",
-            '<div class="cs-date-row">',
-            '<span class="cs-date-label">Price Check Date:</span>',
-            f'<span class="cs-date-val">{date_str}</span>',
-            "</div>",
-            "</div>",
-        ]
-    else:
-        # Normal: two-line arc + savings amount
-        right_html_lines = [
-            '<div class="cs-right">',
-            f'<svg class="cs-arc" viewBox="0 0 250 170" preserveAspectRatio="xMidYMid meet" aria-hidden="true">',
-            "<defs>",
-            f'<path id="arcTop_{uid}" d="M 15,130 A 110,110 0 0,1 235,130" fill="none" stroke="none"></path>',
-            f'<path id="arcBottom_{uid2}" d="M 35,145 A 95,95 0 0,1 215,145" fill="none" stroke="none"></path>',
-            "</defs>",
-            '<text class="cs-arc-text">',
-            f'<textPath href="#arcTop_{uid}" startOffset="50%" text-anchor="middle">BUYING POWER</textPath>',
-            "</text>",
-            '<text class="cs-arc-text cs-arc-text2">',
-            f'<textPath href="#arcBottom_{uid2}" startOffset="50%" text-anchor="middle">SAVINGS</textPath>',
-            "</text>",
-            "</svg>",
-            "",
-            f'<div class="cs-savings cs-savings-positive">{savings_text}</div>',
-            "",
-            '<div class="cs-date-row">',
-            '<span class="cs-date-label">Price Check Date:</span>',
-            f'<span class="cs-date-val">{date_str}</span>',
-            "</div>",
-            "</div>",
-        ]
+def widgets_this_run() -> int | None:
+    # Best effort: where Streamlit tracks this has moved between versions
+    ctx = get_script_run_ctx()
+    ids = getattr(getattr(ctx, "shared", ctx), "widget_ids_this_run", None)
+    if ids is None:
+        return None
+    return len(ids.snapshot() if hasattr(ids, "snapshot") else ids)
+
+
+def show_perf_panel(stats: RerunStats, history: deque[RerunStats]) -> None:
+    st.subheader("⏱️ Performance")
+    st.caption(stats.summary())
+    phases = pd.DataFrame({"ms": {**stats.phases_ms, "total": stats.total_ms}})
+    st.dataframe(phases.round(1))
+    st.dataframe(pd.DataFrame({"KiB": {name: size / 1024 for name, size in stats.payload_bytes.items()}}).round(1))
+    counts = {"cards rendered": stats.cards_rendered, "cards cached": stats.cards_cached, **stats.counts}
+    st.dataframe(pd.DataFrame({"count": counts}))
+
+    # Process-wide, so other sessions' reruns count too
+    caches = {name: cache.info() for name, cache in shared_caches().items()}
+    st.caption("Shared caches (all sessions)")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "entries": {name: info.currsize for name, info in caches.items()},
+                "MiB": {name: info.nbytes / MIB for name, info in caches.items()},
+                "budget MiB": {
+                    name: None if info.maxbytes is None else info.maxbytes / MIB for name, info in caches.items()
+                },
+                "hit %": {
+                    name: 100 * info.hits / (info.hits + info.misses) if info.hits + info.misses else None
+                    for name, info in caches.items()
+                },
+            }
+        ).round(1)
+    )
 
-    return "\n".join(
+    st.caption(f"Last {len(history)} reruns")
+    frame = pd.DataFrame(
         [
-            '<div class="cs-card">',
-            '<div class="cs-header">',
-            '<div class="cs-title">',
-            '<span class="cs-title-compare">Compare</span>',
-            '<span class="cs-title-and"><span>AND</span></span>',
-            '<span class="cs-title-save">Save</span>',
-            "</div>",
-            f'<div class="cs-product">{html.escape(row.name)}</div>',
-            "</div>",
-            "",
-            '<div class="cs-body">',
-            *left_html_lines,
-            "",
-            '<div class="cs-divider" aria-hidden="true"></div>',
-            "",
-            *right_html_lines,
-            "</div>",
-            "</div>",
+            {
+                "run": h.run,
+                "total ms": h.total_ms,
+                **{f"{name} ms": ms for name, ms in h.phases_ms.items()},
+                "payload KiB": sum(h.payload_bytes.values()) / 1024,
+                "cards rendered": h.cards_rendered,
+                "cards cached": h.cards_cached,
+            }
+            for h in history
         ]
-    ).strip()
-
-
-CARD_CSS = """
-<style>
-  @import url('https://fonts.googleapis.com/css2?family=Caveat:wght@600;700&display=swap');
-
-  /* Layout for the paged print grid (also visible on screen) */
-  .cs-pages { display: block; }
-  .cs-page {
-    display: grid;
-    grid-template-columns: 1fr 1fr;
-    grid-template-rows: 1fr 1fr;
-    gap: 0.25in;
-    margin-bottom: 0.25in;
-  }
-
-  .cs-card {
-    background: #fff;
-    border: 3px solid #000;
-    padding: 0.18in 0.2in;
-    box-sizing: border-box;
-    break-inside: avoid;
-    page-break-inside: avoid;
-    display: flex;
-    flex-direction: column;
-    min-height: 3.75in;
-  }
-
-  .cs-header {
-    text-align: center;
-    margin-bottom: 0.06in;
-  }
-
-  .cs-title {
-    line-height: 1;
-    margin-bottom: 0.04in;
-  }
-
-  .cs-title-compare,
-  .cs-title-save {
-    font-family: "Cooper Black", "CooperBlack", Georgia, serif;
-    font-size: 44px;
-    font-weight: 800;
-    letter-spacing: 0.5px;
-  }
-
-  .cs-title-and {
-    display: inline-block;
-    margin: 0 10px;
-    font-family: "Cooper Black", "CooperBlack", Georgia, serif;
-    font-weight: 900;
-    font-size: 26px;
-    position: relative;
-    top: -8px;
-  }
-
-  .cs-title-and span {
-    border-bottom: 4px solid #000;
-    padding-bottom: 2px;
-  }
-
-  .cs-product {
-    font-family: Arial, sans-serif;
-    font-size: 20px;
-    font-weight: 700;
-    margin-top: 2px;
-  }
-
-  .cs-body {
-    display: grid;
-    grid-template-columns: 1fr 0.08in 1.2fr;
-    align-items: stretch;
-    gap: 0.12in;
-    flex: 1 1 auto;
-    min-height: 0;
-  }
-
-  .cs-divider {
-    width: 0.08in;
-    background: #000;
-  }
-
-  .cs-left {
-    display: flex;
-    flex-direction: column;
-    justify-content: center;
-    gap: 0.14in;
-    padding-right: 0.06in;
-  }
-
-  .cs-left-dnc {
-    display: flex;
-    align-items: center;
-    justify-content: center;
-  }
-
-  .cs-price-block {
-    text-align: left;
-  }
-
-  .cs-price-block-center {
-    text-align: center;
-  }
-
-  .cs-label-center {
-    text-align: center;
-  }
-
-  .cs-price-center {
-    text-align: center;
-  }
-
-  .cs-label {
-    font-family: "Caveat", cursive;
-    font-size: 28px;
-    font-weight: 700;
-    text-decoration: underline;
-    text-underline-offset: 5px;
-  }
-
-  .cs-label-line1 {
-    display: block;
-    line-height: 1.05;
-  }
-  .cs-label-line2 {
-    display: block;
-    line-height: 1.05;
-    text-align: center;
-  }
-
-  .cs-price {
-    font-family: Arial, sans-serif;
-    font-size: 44px;
-    font-weight: 900;
-    margin-top: 4px;
-  }
-
-  .cs-right {
-    display: flex;
-    flex-direction: column;
-    justify-content: center;
-    align-items: center;
-    padding-left: 0.06in;
-    text-align: center;
-  }
-
-  .cs-right-dnc {
-    display: grid;
-    grid-template-rows: 1fr auto;
-    justify-items: center;
-    align-items: center;
-  }
-
-  .cs-dnc-line1,
-  .cs-dnc-line2 {
-    display: block;
-  }
-
-  .cs-dnc-line1 {
-    font-size: 24px;
-    font-weight: 900;
-    margin-bottom: 2px;
-  }
-
-  .cs-dnc-line2 {
-    font-size: 22px;
-    font-weight: 900;
-    letter-spacing: 1px;
-  }
-
-  .cs-arc {
-    width: 230px;
-    height: 150px;
-    margin: 0;
-  }
-
-  .cs-arc-text {
-    font-family: Arial, sans-serif;
-    font-size: 18px;
-    font-weight: 900;
-    letter-spacing: 4px;
-    fill: #000;
-  }
-
-  .cs-arc-text2 {
-    font-size: 22px;
-    letter-spacing: 5px;
-  }
-
-  .cs-savings {
-    font-family: Arial, sans-serif;
-    font-size: 64px;
-    font-weight: 900;
-    line-height: 1;
-  }
-
-  .cs-savings-negative {
-    color: #e00000;
-  }
-
-  .cs-savings-positive {
-    color: #000;
-  }
-
-  .cs-date-row {
-    width: 100%;
-    display: flex;
-    justify-content: space-between;
-    margin-top: 8px;
-    font-family: Arial, sans-serif;
-    font-size: 14px;
-  }
-
-  .cs-dnc-big {
-    font-family: Arial, sans-serif;
-    line-height: 1.1;
-    margin: 0;
-    place-self: center;
-  }
-
-  /* Push date to the bottom for DNC cards */
-  .cs-right-dnc .cs-date-row {
-    margin-top: 0;
-    margin-bottom: 2px;
-    align-self: end;
-  }
-
-  /* Print-only behavior: show ONLY the card grid */
-  @page { size: letter landscape; margin: 0.35in; }
-
-  @media print {
-    html, body { overflow: hidden !important; height: auto !important; }
-    body * { visibility: hidden !important; }
-    #print-area, #print-area * { visibility: visible !important; }
-    #print-area { position: static !important; width: 100% !important; overflow: visible !important; }
-
-    /* One .cs-page = one sheet; keep it within printable height so 4 cards stay on one page */
-    .cs-page {
-      break-after: page;
-      page-break-after: always;
-      break-inside: avoid;
-      page-break-inside: avoid;
-      max-height: 7.8in;
-    }
-    .cs-page.is-last {
-      break-after: auto;
-      page-break-after: auto;
-      max-height: none;
-    }
-    .cs-card {
-      margin: 0;
-      height: 3.75in;
-      overflow: hidden;
-    }
-
-    /* Hide Streamlit chrome that can still show in print */
-    [data-testid="stToolbar"],
-    [data-testid="stDecoration"],
-    footer,
-    [data-testid="stHeader"] { display: none !important; visibility: hidden !important; }
-  }
-</style>
-"""
+    ).set_index("run")
+    st.line_chart(frame[["total ms"]])
+    st.dataframe(frame.round(1))
 
 
-st.set_page_config(
-    page_title="Compare and Save",
-    page_icon="💰",
-    layout="wide",
-    initial_sidebar_state="expanded",
-)
+history: deque[RerunStats] = st.session_state.setdefault("perf_history", deque(maxlen=HISTORY_SIZE))
+perf = PerfRecorder(run=history[-1].run + 1 if history else 1)
+
+with perf.phase("setup"):
+    st.set_page_config(
+        page_title="Compare and Save",
+        page_icon="💰",
+        layout="wide",
+        initial_sidebar_state="expanded",
+    )
 
-st.markdown(CARD_CSS, unsafe_allow_html=True)
+    st.markdown(perf.payload("card css", CARD_CSS), unsafe_allow_html=True)
 
-st.title("💰 Compare and Save")
-st.markdown("**Weekly Price Comparison Tool** — Generate printable comparison cards")
+    st.title("💰 Compare and Save")
+    st.markdown("**Weekly Price Comparison Tool** — Generate printable comparison cards")
 
-with st.sidebar:
+with st.sidebar, perf.phase("sidebar"):
     st.header("Settings")
-    competitor = st.radio(
-        "Which competitor are you comparing?",
-        ["Winco", "Safeway/Albertsons"],
-        help="Choose which competitor to generate cards for",
+    competitors = st.multiselect(
+        "Which competitors are you comparing?",
+        COMPETITORS,
+        default=[COMPETITORS[0]],
+        help="Each competitor gets its own deck of cards from the same price list",
     )
     check_date = st.date_input(
         "Price Check Date",
         value=datetime.today(),
         help="Date to display on cards",
     )
+    batch_entry = st.toggle(
+        "Batch entry",
+        value=True,
+        key="batch_entry",
+        on_change=keep_pending_edits,
+        help="Buffer edits in the pricing table and apply them together with **Apply changes**, "
+        "instead of refreshing the app after every cell",
+    )
+    show_perf = st.toggle(
+        "Performance panel",
+        value=perf_enabled_by_env(),
+        key="perf_panel",
+        help="Time each phase of the app, count cards rendered vs. cached and size what each rerun sends",
+    )
+    perf_slot = st.container()
+    if resolve_arc_mode(DEFAULT_ARC_MODE) != DEFAULT_ARC_MODE:
+        st.warning(
+            f"{ARC_MODE_ENV}={DEFAULT_ARC_MODE} is not in effect: {OUTLINED_ARC_UNAVAILABLE}. "
+            f"Cards use the {resolve_arc_mode(DEFAULT_ARC_MODE)} arc."
+        )
 
 tab1, tab2 = st.tabs(["📊 Input Data", "🖨️ Print"])
 
-products_data: list[ProductRow] = []
-error_products: list[ProductRow] = []
+products_table = empty_price_table(0)
 
-with tab1:
+with tab1, perf.phase("input"):
     st.header("Enter Product Prices")
 
-    left, right = st.columns([2, 1])
-    with right:
-        num_products = st.number_input(
-            "How many products?",
-            min_value=1,
-            max_value=100,
-            value=10,
-            step=1,
-            help="Add/remove products as needed",
-        )
-
-    with left:
-        st.markdown("**Pricing Data**")
-
-    header_cols = st.columns([3, 1.5, 1.5, 1])
-    header_cols[0].markdown("**Product Name**")
-    header_cols[1].markdown("**Super 1 Price**")
-    header_cols[2].markdown("**Competitor Price**")
-    header_cols[3].markdown("**Carries?**")
-
-    for i in range(int(num_products)):
-        c1, c2, c3, c4 = st.columns([3, 1.5, 1.5, 1])
-
-        with c1:
-            name = st.text_input(
-                "Product Name",
-                key=f"product_{i}",
-                label_visibility="collapsed",
-                placeholder=f"Product {i + 1}",
-            ).strip()
-
-        with c2:
-            super_one_price = st.number_input(
-                "Super 1",
-                min_value=0.0,
-                step=0.01,
-                key=f"super1_{i}",
-                label_visibility="collapsed",
-                format="%.2f",
-            )
-
-        with c3:
-            competitor_price = st.number_input(
-                "Competitor",
-                min_value=0.0,
-                step=0.01,
-                key=f"competitor_{i}",
-                label_visibility="collapsed",
-                format="%.2f",
+    uploaded = st.file_uploader(
+        "Import a price list",
+        type=["csv", "xlsx", "xlsm"],
+        key="price_list_upload",
+        help="CSV or Excel sheet laid out like the weekly template: Product Name, Super 1 Price, "
+        "and a Price / Carries? column per competitor (or one Competitor Price column). "
+        "Imported products are added to the table below.",
+    )
+    imported = load_price_list_upload(uploaded)
+    editor_columns = ["Product Name", "Super 1 Price"] + [
+        column for competitor in competitors for column in (price_column(competitor), carries_column(competitor))
+    ]
+    if len(imported):
+        st.success(f"Imported **{len(imported):,}** products from **{uploaded.name}**")
+        with st.expander("Preview import"):
+            st.dataframe(
+                imported.head(IMPORT_PREVIEW_ROWS),
+                hide_index=True,
+                column_order=editor_columns,
             )
 
-        with c4:
-            carries = st.selectbox(
-                "Carries?",
-                ["Yes", "DNC"],
-                key=f"carries_{i}",
-                label_visibility="collapsed",
+    st.markdown("**Pricing Data**")
+
+    catalog = open_catalog()
+    if "products_frame" not in st.session_state:
+        # Start from the most recent saved week instead of a blank list
+        frame = catalog_frame(catalog, check_date)
+        st.session_state["products_frame"] = empty_price_table(DEFAULT_NUM_PRODUCTS) if frame is None else frame
+
+    # In batch entry the editor lives in a form: edits stay in the browser
+    # until "Apply changes", so typing a whole list costs a single rerun.
+    with st.form("products_form") if batch_entry else nullcontext():
+        edited_frame = st.data_editor(
+            st.session_state["products_frame"],
+            key="products_editor",
+            num_rows="dynamic",
+            hide_index=True,
+            column_order=editor_columns,
+            column_config={
+                "Product Name": st.column_config.TextColumn("Product Name", width="large"),
+                "Super 1 Price": st.column_config.NumberColumn("Super 1 Price", min_value=0.0, step=0.01, format="%.2f"),
+                **{
+                    price_column(c): st.column_config.NumberColumn(price_column(c), min_value=0.0, step=0.01, format="%.2f")
+                    for c in COMPETITORS
+                },
+                **{
+                    carries_column(c): st.column_config.SelectboxColumn(
+                        carries_column(c), options=["Yes", "DNC"], default="Yes", required=True
+                    )
+                    for c in COMPETITORS
+                },
+            },
+        )
+        if batch_entry:
+            st.form_submit_button("Apply changes", type="primary")
+    st.session_state["products_applied"] = edited_frame
+
+    feed_folder = os.environ.get(FEEDS_DIR_ENV, "").strip()
+    if feed_folder:
+        if Path(feed_folder).is_dir():
+            watch_price_feeds(feed_folder)
+        else:
+            st.warning(f"Price feed folder **{feed_folder}** ({FEEDS_DIR_ENV}) does not exist.")
+
+    with perf.phase("validation"):
+        products_table = clean_price_table(pd.concat([imported, edited_frame], ignore_index=True) if len(imported) else edited_frame)
+        error_products = price_error_table(products_table, competitors)
+    perf.count("products", len(products_table))
+
+    load_col, save_col, _ = st.columns([1, 1, 3])
+    with load_col:
+        st.button(
+            "Load from catalog",
+            on_click=load_from_catalog,
+            args=(check_date,),
+            help="Replace the table with the latest saved week on or before the price check date",
+        )
+    with save_col:
+        if st.button("Save to catalog", disabled=products_table.empty, help="Save this list as the price check date's week"):
+            changes = catalog.save(check_date, checks_from_frame(products_table))
+            message = (
+                f"Saved week of {check_date:%b %d, %Y}: **{len(changes.changed):,}** new or re-priced, "
+                f"**{len(changes.removed):,}** removed, {changes.unchanged:,} unchanged."
             )
-
-        if not name:
-            continue
-
-        row = ProductRow(
-            name=name,
-            super_one_price=float(super_one_price or 0.0),
-            competitor_price=float(competitor_price or 0.0),
-            carries=str(carries),
+            if changes.duplicates:
+                listed = ", ".join(changes.duplicates[:MAX_LISTED_ERRORS])
+                more = f" and {len(changes.duplicates) - MAX_LISTED_ERRORS:,} more" if len(changes.duplicates) > MAX_LISTED_ERRORS else ""
+                message += (
+                    f"\n\n**{len(changes.duplicates):,}** row(s) repeat a product further down the list and were not "
+                    f"saved (the later row was): {listed}{more}."
+                )
+            st.session_state["catalog_message"] = ("warning" if changes.duplicates else "success", message)
+    with st.expander("Pair competitor names"):
+        st.caption(
+            "Match a competitor list whose names are spelled differently (\"TILLAMOOK MED CHED 32OZ\") "
+            "to the products above, then copy the prices of the pairs you keep."
         )
-        products_data.append(row)
+        show_name_pairing(competitors, products_table)
 
-        if row.carries == "Yes" and row.competitor_price > 0 and row.super_one_price > row.competitor_price:
-            error_products.append(row)
+    if "catalog_message" in st.session_state:
+        kind, message = st.session_state.pop("catalog_message")
+        getattr(st, kind)(message)
 
-    if error_products:
+    if len(error_products):
         st.error(
             f"🚨 **HOLD UP!** 🚨\n\n"
-            f"**{len(error_products)} product(s) have HIGHER Super 1 prices than the competitor!**\n\n"
+            f"**{len(error_products):,} product(s) have HIGHER Super 1 prices than the competitor!**\n\n"
             "This defeats the purpose of the comparison. Fix these ASAP."
         )
-        for row in error_products:
-            st.error(f"❌ **{row.name}** — Super 1: {money(row.super_one_price)} vs {competitor}: {money(row.competitor_price)}")
+        for error in error_products.head(MAX_LISTED_ERRORS).itertuples():
+            st.error(
+                f"❌ **{error.name}** — Super 1: {money(error.super_one_price)} vs {error.competitor}: {money(error.competitor_price)}"
+            )
+        if len(error_products) > MAX_LISTED_ERRORS:
+            st.error(f"…and {len(error_products) - MAX_LISTED_ERRORS:,} more.")
 
     st.info(
         "💡 **How to use:**\n"
-        "1. Enter product names and prices\n"
-        "2. Select 'DNC' (Does Not Carry) if the competitor doesn't have the item\n"
+        "1. Enter product names and prices in the table (use the **+** row to add products), "
+        "then **Apply changes** if batch entry is on\n"
+        "2. Select 'DNC' (Does Not Carry) if a competitor doesn't have the item\n"
         "3. Go to **Print** tab to see how cards will look and to print"
     )
 
-with tab2:
+with tab2, perf.phase("print"):
     st.header("Print Your Cards")
 
-    if not products_data:
+    if products_table.empty:
         st.warning("No products entered yet. Go to 'Input Data' tab to add products.")
+    elif not competitors:
+        st.warning("Pick at least one competitor in the sidebar.")
     else:
-        valid = [r for r in products_data if r.carries != "DNC" and r.competitor_price > 0 and r.super_one_price > 0]
-        dnc = [r for r in products_data if r.carries == "DNC" or r.competitor_price == 0]
-        all_items = valid + dnc
-
-        # Build paginated HTML: 4 cards per page in a 2x2 grid
-        pages: list[list[ProductRow]] = []
-        for i in range(0, len(all_items), 4):
-            pages.append(all_items[i : i + 4])
-
-        pages_html = '<div class="cs-pages">'
-        for pi, page_rows in enumerate(pages):
-            is_last = pi == len(pages) - 1
-            pages_html += f'<div class="cs-page{" is-last" if is_last else ""}">'
-            for row in page_rows:
-                pages_html += render_card_html(competitor=competitor, check_date=check_date, row=row)
-            pages_html += "</div>"
-        pages_html += "</div>"
-
-        print_doc = (
-            "<!doctype html><html><head><meta charset='utf-8'>"
-            "<meta name='viewport' content='width=device-width, initial-scale=1'>"
-            "<title>Compare and Save - Print</title>"
-            + CARD_CSS +
-            "</head><body style='margin:0; overflow:auto;'>"
-            + f"<div id='print-area'>{pages_html}</div>"
-            + "</body></html>"
-        )
-
-        # Print button and how-to at the top
-        components.html(
-            f"""
-<div style="margin: 0 0 20px 0;">
-  <button id="openPrint" style="padding:12px 20px;border:none;border-radius:8px;background:#1976d2;color:white;cursor:pointer;font-weight:600;font-size:1em;">
-    Open print-only view
-  </button>
-  <p style="margin:10px 0 0 0;color:#333;font-size:0.95em;">Use <strong>"Open print-only view"</strong> above. Then press <strong>Ctrl+P</strong> (or <strong>Cmd+P</strong>) in that window to print.</p>
-</div>
-<script>
-  const html = {json.dumps(print_doc)};
-  document.getElementById("openPrint").addEventListener("click", () => {{
-    const w = window.open("", "_blank");
-    if (!w) {{ alert("Please allow pop-ups for this site."); return; }}
-    w.document.open();
-    w.document.write(html);
-    w.document.close();
-    w.focus();
-  }});
-</script>
-""",
-            height=85,
-        )
-
-        # Summary
-        num_pages = (len(all_items) + 3) // 4
-        col1, col2, _ = st.columns([1, 1, 2])
-        with col1:
-            st.metric(label="Total Cards", value=len(all_items))
-        with col2:
-            st.metric(label="Pages Needed", value=num_pages)
-
-        st.markdown("---")
-        st.markdown("### Printable Cards (4 per page)")
-
-        st.markdown(f'<div id="print-area">{pages_html}</div>', unsafe_allow_html=True)
-
+        with perf.phase("digest"):
+            table_key = table_digest(products_table)
+        deck_tabs = st.tabs(competitors) if len(competitors) > 1 else [st.container()]
+        for competitor, deck_tab in zip(competitors, deck_tabs):
+            with deck_tab:
+                show_deck(competitor, check_date, products_table, table_key)
+
+# Phases above overlap (e.g. "cards" runs inside "print"); total is wall time
+widgets = widgets_this_run()
+if widgets is not None:
+    perf.count("widgets", widgets)
+stats = perf.finish()
+history.append(stats)
+if show_perf:
+    with perf_slot:
+        show_perf_panel(stats, history)
@@ -0,0 +1,52 @@
+# Save to catalog / Load from catalog with a price list upload in the widget
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from compare_and_save import empty_price_table
+from compare_and_save.catalog import CATALOG_PATH_ENV
+
+APP_PATH = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+
+UPLOAD = b"Product Name,Super 1 Price,Winco Price,Winco Carries?\nBread,2.49,2.99,Yes\nEggs 12ct,2.99,3.49,Yes\n"
+
+
+def app(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, names: list[str]) -> AppTest:
+    monkeypatch.setenv(CATALOG_PATH_ENV, str(tmp_path / "catalog.sqlite3"))
+    products = empty_price_table(len(names))
+    products["Product Name"] = names
+    products["Super 1 Price"] = [1.99] * len(names)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.session_state["products_frame"] = products
+    return at.run()
+
+
+def click(at: AppTest, label: str) -> AppTest:
+    next(button for button in at.button if button.label == label).click()
+    return at.run()
+
+
+def test_load_after_save_does_not_repeat_imported_rows(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    at = app(tmp_path, monkeypatch, ["Milk 1gal"])
+    next(uploader for uploader in at.file_uploader if uploader.key == "price_list_upload").set_value(
+        ("store.csv", UPLOAD, "text/csv")
+    )
+    at.run()
+    click(at, "Save to catalog")
+    click(at, "Load from catalog")
+
+    assert not at.exception
+    assert any("Loaded **3** products" in message.value for message in at.success)
+    assert at.session_state["products_frame"]["Product Name"].tolist() == ["Bread", "Eggs 12ct", "Milk 1gal"]
+    assert len(at.session_state["imported_price_list"][1]) == 0
+
+
+def test_save_reports_repeated_names(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    at = app(tmp_path, monkeypatch, ["Milk 1gal", "Bread", "MILK 1GAL!"])
+    click(at, "Save to catalog")
+
+    assert not at.exception
+    assert any("**1** row(s) repeat a product" in warning.value and "Milk 1gal" in warning.value for warning in at.warning)
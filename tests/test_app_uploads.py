@@ -0,0 +1,39 @@
+# Unreadable uploads are reported in the app, not raised from the script run
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from compare_and_save import empty_price_table
+from compare_and_save.catalog import CATALOG_PATH_ENV
+
+APP_PATH = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+
+LATIN_1_CSV = "Product Name,Super 1 Price,Winco Price,Winco Carries?\nCr\xe8me fra\xeeche,3.49,3.99,Yes\n".encode("latin-1")
+CORRUPT_XLSX = b"PK\x03\x04" + b"\x00half-written workbook" * 10
+
+
+@pytest.mark.parametrize("key", ["price_list_upload", "pairing_upload"])
+@pytest.mark.parametrize(
+    "upload",
+    [("store.xlsx", CORRUPT_XLSX, "application/octet-stream"), ("store.csv", LATIN_1_CSV, "text/csv")],
+    ids=["corrupt-xlsx", "latin-1-csv"],
+)
+def test_unreadable_upload_shows_error(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, key: str, upload: tuple[str, bytes, str]
+) -> None:
+    monkeypatch.setenv(CATALOG_PATH_ENV, str(tmp_path / "catalog.sqlite3"))
+    products = empty_price_table(2)
+    products["Product Name"] = ["Milk 1gal", "Eggs 12ct"]
+    products["Super 1 Price"] = [3.49, 2.99]
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.session_state["products_frame"] = products
+    at.run()
+    next(uploader for uploader in at.file_uploader if uploader.key == key).set_value(upload)
+    at.run()
+
+    assert not at.exception
+    assert any(upload[0] in error.value for error in at.error)